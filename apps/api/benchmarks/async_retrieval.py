@@ -0,0 +1,72 @@
+"""Concurrent items retrieval: blocking calls in a thread pool vs the async path.
+
+Fires N retrievals at once, as N simultaneous /agent requests would. The
+blocking retriever runs in a pool the size of anyio's default thread limit
+(40), the async one runs on the event loop alone. Each run uses distinct
+queries so caches and single-flight do not collapse the work. Reports wall
+time, throughput and per-request p50/p99.
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from shared.retrieval import retrieve_items_data, aretrieve_items_data
+from shared.embeddings import embedding_cache
+from shared.qdrant import close_async_qdrant_client
+from benchmarks.utils import load_eval_examples, timed, latency_summary
+from ingestion.reporting import print_table
+
+
+async def _atimed(coro):
+    started_at = time.perf_counter()
+    await coro
+
+    return (time.perf_counter() - started_at) * 1000
+
+
+async def run_async(queries, k):
+    try:
+        return await asyncio.gather(*[_atimed(aretrieve_items_data(query, k)) for query in queries])
+    finally:
+        await close_async_qdrant_client()
+
+
+def run_threaded(queries, k, threads):
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return list(executor.map(lambda query: timed(retrieve_items_data, query, k)[1], queries))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[50, 200, 500])
+    parser.add_argument("--threads", type=int, default=40, help="Thread pool size for the blocking path")
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+
+    questions = [question for question, _ in load_eval_examples()]
+
+    rows = []
+    for concurrency in args.concurrency:
+        for name in ["threaded", "async"]:
+            queries = [f"{questions[i % len(questions)]} ({name} {concurrency} #{i})" for i in range(concurrency)]
+            embedding_cache.clear()
+
+            if name == "threaded":
+                latencies, wall_ms = timed(run_threaded, queries, args.k, args.threads)
+            else:
+                latencies, wall_ms = timed(asyncio.run, run_async(queries, args.k))
+
+            rows.append({
+                "path": name,
+                "concurrency": concurrency,
+                "wall_ms": wall_ms,
+                "requests_per_s": concurrency / wall_ms * 1000,
+                **latency_summary(latencies),
+            })
+
+    print_table(rows, list(rows[0].keys()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Compare full and reduced-dimension embeddings on the Amazon items collection.
+
+For each dimension the query is embedded once, then the hybrid search is timed
+on its own so the numbers isolate Qdrant's dense search cost. Reports search
+p50/p99, recall@k against the retriever eval dataset and the raw float32
+vector memory of each collection. Reduced variants are built with --build.
+"""
+import argparse
+
+from qdrant_client import QdrantClient
+
+from shared.embedding_providers import get_embedding_provider
+from api.core.config import config
+from benchmarks.utils import load_eval_examples, recall_at_k, timed, latency_summary, hybrid_search
+from ingestion.reporting import print_table
+from ingestion.qdrant_collections import copy_items_collection
+from ingestion.reembed_items import variant_collection_name
+
+
+def benchmark_dimensions(qdrant_client, provider, collection, examples, k, repeats):
+    embeddings, _ = provider.embed_queries([question for question, _ in examples])
+
+    search_latencies = []
+    recalls = []
+
+    for (question, reference_ids), embedding in zip(examples, embeddings):
+        for _ in range(repeats):
+            points, search_ms = timed(hybrid_search, qdrant_client, collection, provider.vector_name, embedding, question, k)
+            search_latencies.append(search_ms)
+        recalls.append(recall_at_k([point.payload["parent_asin"] for point in points], reference_ids))
+
+    points_count = qdrant_client.get_collection(collection).points_count
+    summary = latency_summary(search_latencies)
+
+    return {
+        "collection": collection,
+        "dimensions": provider.dimensions,
+        "search_p50_ms": summary["p50_ms"],
+        "search_p99_ms": summary["p99_ms"],
+        f"recall@{k}": sum(recalls) / len(recalls),
+        "vector_mb": points_count * provider.dimensions * 4 / 1024 / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--qdrant-url", default="http://localhost:6333")
+    parser.add_argument("--model", default="text-embedding-3-small")
+    parser.add_argument("--dimensions", type=int, nargs="+", default=[256, 512])
+    parser.add_argument("--source-collection", default=config.ITEMS_COLLECTION)
+    parser.add_argument("--build", action="store_true", help="(Re)build the reduced-dimension collections first")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=5, help="Timed searches per query")
+    parser.add_argument("--limit", type=int, default=None, help="Only use the first N eval examples")
+    args = parser.parse_args()
+
+    qdrant_client = QdrantClient(url=args.qdrant_url)
+    examples = load_eval_examples(limit=args.limit)
+
+    variants = [(get_embedding_provider(args.model), args.source_collection)]
+    for dimensions in args.dimensions:
+        provider = get_embedding_provider(args.model, dimensions)
+        collection = variant_collection_name(args.source_collection, provider)
+        if args.build:
+            copy_items_collection(qdrant_client, provider, args.source_collection, collection)
+        variants.append((provider, collection))
+
+    rows = [
+        benchmark_dimensions(qdrant_client, provider, collection, examples, args.k, args.repeats)
+        for provider, collection in variants
+    ]
+
+    print(f"\n{len(examples)} queries x {args.repeats} repeats, k={args.k}\n")
+    print_table(rows, list(rows[0].keys()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Compare OpenAI and local fastembed query embeddings on the Amazon items collection.
+
+Builds (with --build) a copy of the items collection whose dense vectors come
+from the local model, then reports per-query embedding and end-to-end hybrid
+retrieval latency (p50/p99) plus recall@k against the retriever eval dataset.
+"""
+import argparse
+
+from qdrant_client import QdrantClient
+
+from shared.embedding_providers import get_embedding_provider
+from api.core.config import config
+from benchmarks.utils import load_eval_examples, recall_at_k, timed, latency_summary, hybrid_search
+from ingestion.reporting import print_table
+from ingestion.qdrant_collections import copy_items_collection
+from ingestion.reembed_items import variant_collection_name
+
+
+def benchmark_provider(qdrant_client, provider, collection, examples, k):
+    embed_latencies = []
+    total_latencies = []
+    recalls = []
+
+    # Warm up connections and, for local models, the ONNX session
+    provider.embed_queries([examples[0][0]])
+
+    for question, reference_ids in examples:
+        (embeddings, _), embed_ms = timed(provider.embed_queries, [question])
+        points, search_ms = timed(hybrid_search, qdrant_client, collection, provider.vector_name, embeddings[0], question, k)
+
+        embed_latencies.append(embed_ms)
+        total_latencies.append(embed_ms + search_ms)
+        recalls.append(recall_at_k([point.payload["parent_asin"] for point in points], reference_ids))
+
+    embed_summary = latency_summary(embed_latencies)
+    total_summary = latency_summary(total_latencies)
+
+    return {
+        "provider": provider.name,
+        "model": provider.model,
+        "dimensions": provider.dimensions,
+        "embed_p50_ms": embed_summary["p50_ms"],
+        "embed_p99_ms": embed_summary["p99_ms"],
+        "retrieval_p50_ms": total_summary["p50_ms"],
+        "retrieval_p99_ms": total_summary["p99_ms"],
+        f"recall@{k}": sum(recalls) / len(recalls),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--qdrant-url", default="http://localhost:6333")
+    parser.add_argument("--openai-model", default="text-embedding-3-small")
+    parser.add_argument("--local-model", default="BAAI/bge-small-en-v1.5")
+    parser.add_argument("--source-collection", default=config.ITEMS_COLLECTION)
+    parser.add_argument("--local-collection", default=None, help="Defaults to <source-collection>-<local vector name>")
+    parser.add_argument("--build", action="store_true", help="(Re)build the local collection before benchmarking")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=None, help="Only use the first N eval examples")
+    args = parser.parse_args()
+
+    qdrant_client = QdrantClient(url=args.qdrant_url)
+
+    openai_provider = get_embedding_provider(args.openai_model)
+    local_provider = get_embedding_provider(args.local_model)
+    local_collection = args.local_collection or variant_collection_name(args.source_collection, local_provider)
+
+    if args.build:
+        copy_items_collection(qdrant_client, local_provider, args.source_collection, local_collection)
+
+    examples = load_eval_examples(limit=args.limit)
+
+    rows = [
+        benchmark_provider(qdrant_client, openai_provider, args.source_collection, examples, args.k),
+        benchmark_provider(qdrant_client, local_provider, local_collection, examples, args.k),
+    ]
+
+    print(f"\n{len(examples)} queries, k={args.k}\n")
+    print_table(rows, list(rows[0].keys()))
+    print(f"\nTo serve from the local model set ITEMS_COLLECTION={local_collection} ITEMS_EMBEDDING_MODEL={args.local_model}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Measure what the shared LLM client registry saves per LLM call.
+
+Sends the same minimal chat completion (max_tokens=1, so generation time
+does not drown out connection setup) through three setups: a new OpenAI
+client per call (what generate_answer used to do), one pooled client on
+HTTP/1.1 and one pooled client on HTTP/2. Every setup counts the TCP
+connections and TLS handshakes it opens. Reports p50/p99/mean per call, the
+handshakes saved and the p50 gain against the per-call client, sequentially
+and under load.
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import openai
+
+from api.agents.utils.llm_clients import create_llm_http_client, http2_available, ConnectionCounter
+from benchmarks.utils import timed, latency_summary
+from ingestion.reporting import print_table
+
+
+MESSAGES = [{"role": "user", "content": "Reply with OK."}]
+
+
+def chat(client, model):
+    return client.chat.completions.create(model=model, messages=MESSAGES, max_tokens=1, temperature=0)
+
+
+def per_call_chat(counter, model):
+    with create_llm_http_client(http2=False, counter=counter) as http_client:
+        return chat(openai.OpenAI(http_client=http_client), model)
+
+
+def run_calls(call, n, concurrency):
+    if concurrency == 1:
+        return [timed(call)[1] for _ in range(n)]
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return [latency for _, latency in executor.map(lambda _: timed(call), range(n))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", default="gpt-4.1-mini")
+    parser.add_argument("--calls", type=int, default=30, help="Calls per setup and concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    args = parser.parse_args()
+
+    setups = {"per_call_client": None, "shared_http1": False}
+    if http2_available():
+        setups["shared_http2"] = True
+    else:
+        print("h2 is not installed, skipping the HTTP/2 setup")
+
+    rows = []
+    for concurrency in args.concurrency:
+        baseline = None
+
+        for name, http2 in setups.items():
+            counter = ConnectionCounter()
+
+            if http2 is None:
+                call = lambda: per_call_chat(counter, args.model)
+                http_client = None
+            else:
+                http_client = create_llm_http_client(http2=http2, counter=counter)
+                client = openai.OpenAI(http_client=http_client)
+                call = lambda: chat(client, args.model)
+
+                # Open the pooled connections so only steady state is measured
+                run_calls(call, concurrency, concurrency)
+                counter = ConnectionCounter()
+                http_client.event_hooks = {"request": [counter.on_request]}
+
+            summary = latency_summary(run_calls(call, args.calls, concurrency))
+            connections = counter.stats()
+            baseline = baseline or {**summary, **connections}
+
+            rows.append({
+                "setup": name,
+                "concurrency": concurrency,
+                **summary,
+                "connections": connections["connections"],
+                "tls_handshakes": connections["tls_handshakes"],
+                "handshakes_saved": baseline["tls_handshakes"] - connections["tls_handshakes"],
+                "p50_gain_ms": baseline["p50_ms"] - summary["p50_ms"],
+            })
+
+            if http_client is not None:
+                http_client.close()
+
+    print(f"\n{args.calls} calls to {args.model} per setup and concurrency level\n")
+    print_table(rows, list(rows[0].keys()))
+
+
+if __name__ == "__main__":
+    main()
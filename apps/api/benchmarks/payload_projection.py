@@ -0,0 +1,99 @@
+"""Bytes transferred and deserialization time with full vs projected payloads.
+
+Sends the items and reviews retrieval queries over REST, once with
+with_payload=true (the previous behaviour) and once with each retriever's
+include list, and reports the response size, request latency and the time
+spent turning the response into qdrant-client models. Dense queries only,
+so the numbers do not depend on BM25 inference.
+"""
+import argparse
+import json
+import time
+
+import httpx
+from qdrant_client.http.models import QueryResponse
+
+from shared.retrieval import ITEMS_PAYLOAD_FIELDS, REVIEWS_PAYLOAD_FIELDS
+from shared.embedding_providers import items_embedding_provider, get_embedding_provider
+from api.core.config import config
+from benchmarks.utils import load_eval_examples, timed, latency_summary
+from ingestion.reporting import print_table
+
+
+def run_query(http_client, url, collection, body):
+    started_at = time.perf_counter()
+    response = http_client.post(f"{url}/collections/{collection}/points/query", json=body)
+    response.raise_for_status()
+    request_ms = (time.perf_counter() - started_at) * 1000
+
+    _, deserialize_ms = timed(lambda: QueryResponse.model_validate(json.loads(response.content)["result"]))
+
+    return len(response.content), request_ms, deserialize_ms
+
+
+def benchmark(http_client, url, collection, bodies, with_payload):
+    sizes, request_latencies, deserialize_latencies = [], [], []
+
+    for body in bodies:
+        size, request_ms, deserialize_ms = run_query(http_client, url, collection, {**body, "with_payload": with_payload, "with_vector": False})
+        sizes.append(size)
+        request_latencies.append(request_ms)
+        deserialize_latencies.append(deserialize_ms)
+
+    return {
+        "collection": collection,
+        "payload": "full" if with_payload is True else ",".join(with_payload),
+        "avg_kb": sum(sizes) / len(sizes) / 1024,
+        "request_p50_ms": latency_summary(request_latencies)["p50_ms"],
+        "request_p99_ms": latency_summary(request_latencies)["p99_ms"],
+        "deserialize_p50_ms": latency_summary(deserialize_latencies)["p50_ms"],
+        "deserialize_p99_ms": latency_summary(deserialize_latencies)["p99_ms"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--qdrant-url", default="http://localhost:6333")
+    parser.add_argument("--k", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=None, help="Only use the first N eval examples")
+    args = parser.parse_args()
+
+    examples = load_eval_examples(limit=args.limit)
+    items_provider = items_embedding_provider()
+    reviews_provider = get_embedding_provider("text-embedding-3-small")
+
+    questions = [question for question, _ in examples]
+    items_embeddings, _ = items_provider.embed_queries(questions)
+    reviews_embeddings, _ = reviews_provider.embed_queries(questions)
+
+    items_bodies = [
+        {"query": embedding, "using": items_provider.vector_name, "limit": args.k}
+        for embedding in items_embeddings
+    ]
+    reviews_bodies = [
+        {
+            "query": embedding,
+            "filter": {"must": [{"key": "parent_asin", "match": {"any": reference_ids}}]},
+            "limit": args.k,
+        }
+        for embedding, (_, reference_ids) in zip(reviews_embeddings, examples)
+    ]
+
+    with httpx.Client(timeout=30) as http_client:
+        rows = []
+        for collection, bodies, fields in [
+            (config.ITEMS_COLLECTION, items_bodies, ITEMS_PAYLOAD_FIELDS),
+            (config.REVIEWS_COLLECTION, reviews_bodies, REVIEWS_PAYLOAD_FIELDS),
+        ]:
+            # Warm up the connection
+            run_query(http_client, args.qdrant_url, collection, bodies[0])
+
+            rows.append(benchmark(http_client, args.qdrant_url, collection, bodies, True))
+            rows.append(benchmark(http_client, args.qdrant_url, collection, bodies, fields))
+
+    print(f"\n{len(examples)} queries per row, k={args.k}\n")
+    print_table(rows, list(rows[0].keys()))
+
+
+if __name__ == "__main__":
+    main()
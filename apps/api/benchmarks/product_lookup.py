@@ -0,0 +1,70 @@
+"""Compare per-reference and bulk product payload lookups.
+
+The answer enrichment used to run one filtered dummy-vector query per
+referenced ASIN. This times that against one filtered scroll with MatchAny
+and a payload projection for growing numbers of references, with the
+in-process cache bypassed, so the bulk lookup's cost should stay flat.
+"""
+import argparse
+import random
+
+import numpy as np
+from qdrant_client.models import Filter, FieldCondition, MatchValue
+
+from api.agents.utils.catalog import fetch_products
+from shared.embedding_providers import items_embedding_provider
+from shared.qdrant import create_qdrant_client
+from api.core.config import config
+from benchmarks.utils import timed, latency_summary
+from ingestion.reporting import print_table
+
+
+def per_reference_lookup(qdrant_client, collection, asins):
+    provider = items_embedding_provider()
+    dummy_vector = np.zeros(provider.dimensions).tolist()
+
+    return {
+        asin: qdrant_client.query_points(
+            collection_name=collection,
+            query=dummy_vector,
+            limit=1,
+            using=provider.vector_name,
+            with_payload=True,
+            query_filter=Filter(must=[FieldCondition(key="parent_asin", match=MatchValue(value=asin))]),
+        ).points[0].payload
+        for asin in asins
+    }
+
+
+def sample_asins(qdrant_client, collection, count, seed=0):
+    points, _ = qdrant_client.scroll(collection_name=collection, limit=max(count * 10, 100), with_payload=["parent_asin"])
+    asins = sorted({point.payload["parent_asin"] for point in points})
+
+    return random.Random(seed).sample(asins, min(count, len(asins)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--qdrant-url", default="http://localhost:6333")
+    parser.add_argument("--collection", default=config.ITEMS_COLLECTION)
+    parser.add_argument("--references", type=int, nargs="+", default=[1, 5, 10, 20, 50])
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    qdrant_client = create_qdrant_client(args.qdrant_url)
+    asins = sample_asins(qdrant_client, args.collection, max(args.references))
+
+    rows = []
+    for count in args.references:
+        references = asins[:count]
+
+        for name, lookup in [("per_reference", per_reference_lookup), ("bulk_scroll", fetch_products)]:
+            latencies = [timed(lookup, qdrant_client, args.collection, references)[1] for _ in range(args.repeats)]
+            rows.append({"lookup": name, "references": len(references), **latency_summary(latencies)})
+
+    print(f"\n{args.repeats} lookups per row\n")
+    print_table(rows, list(rows[0].keys()))
+
+
+if __name__ == "__main__":
+    main()
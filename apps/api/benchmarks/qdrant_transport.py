@@ -0,0 +1,86 @@
+"""Measure what the shared Qdrant client saves per retrieval request.
+
+Runs the items hybrid search for every eval question through three setups:
+a new QdrantClient per request (the old behaviour), the shared pooled REST
+client and the shared gRPC client. Query embeddings are computed once up
+front so only Qdrant time is measured. Reports p50/p99/mean per request and
+the saving against the per-request client, sequentially and under load.
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from qdrant_client import QdrantClient
+
+from shared.embedding_providers import items_embedding_provider
+from shared.qdrant import create_qdrant_client
+from api.core.config import config
+from benchmarks.utils import load_eval_examples, timed, latency_summary, hybrid_search
+from ingestion.reporting import print_table
+
+
+def per_request_search(url, *args):
+    return hybrid_search(QdrantClient(url=url), *args)
+
+
+def run_requests(search, requests, concurrency):
+    if concurrency == 1:
+        return [timed(search, *request)[1] for request in requests]
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return [latency for _, latency in executor.map(lambda request: timed(search, *request), requests)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--qdrant-url", default="http://localhost:6333")
+    parser.add_argument("--collection", default=config.ITEMS_COLLECTION)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--repeats", type=int, default=5, help="Passes over the eval questions per setup")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--limit", type=int, default=None, help="Only use the first N eval examples")
+    args = parser.parse_args()
+
+    provider = items_embedding_provider()
+    questions = [question for question, _ in load_eval_examples(limit=args.limit)]
+    embeddings, _ = provider.embed_queries(questions)
+
+    requests = [
+        (args.collection, provider.vector_name, embedding, question, args.k)
+        for question, embedding in zip(questions, embeddings)
+    ] * args.repeats
+
+    rest_client = create_qdrant_client(args.qdrant_url, prefer_grpc=False)
+    grpc_client = create_qdrant_client(args.qdrant_url, prefer_grpc=True)
+
+    setups = {
+        "per_request_rest": lambda *request: per_request_search(args.qdrant_url, *request),
+        "shared_rest": lambda *request: hybrid_search(rest_client, *request),
+        "shared_grpc": lambda *request: hybrid_search(grpc_client, *request),
+    }
+
+    # Open the pooled connections and channels so setup cost is not counted
+    for search in setups.values():
+        search(*requests[0])
+
+    rows = []
+    for concurrency in args.concurrency:
+        baseline = None
+
+        for name, search in setups.items():
+            summary = latency_summary(run_requests(search, requests, concurrency))
+            baseline = baseline or summary
+
+            rows.append({
+                "setup": name,
+                "concurrency": concurrency,
+                **summary,
+                "saved_per_request_ms": baseline["mean_ms"] - summary["mean_ms"],
+            })
+
+    print(f"\n{len(requests)} requests per setup against {urlparse(args.qdrant_url).netloc} (gRPC port {config.QDRANT_GRPC_PORT}), k={args.k}\n")
+    print_table(rows, list(rows[0].keys()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Recall, latency and memory of the items collection under each storage profile.
+
+Queries are embedded once, then the hybrid search runs against every profile
+copy with that profile's SearchParams (rescoring and oversampling for the
+quantized ones). Reports recall@k against the retriever eval dataset, search
+p50/p99 and the dense vector RAM each profile needs: full float32 vectors
+unless they are on disk, plus the quantized copy. Profile copies are built
+with --build or `make build-storage-profiles`.
+"""
+import argparse
+
+from qdrant_client import QdrantClient
+
+from shared.embedding_providers import items_embedding_provider
+from shared.storage_profiles import STORAGE_PROFILES, get_storage_profile
+from api.core.config import config
+from benchmarks.utils import load_eval_examples, recall_at_k, timed, latency_summary, hybrid_search
+from ingestion.reporting import print_table
+from ingestion.build_storage_profiles import profile_collection_name
+from ingestion.qdrant_collections import copy_collection_with_profile
+
+
+def benchmark_profile(qdrant_client, provider, profile, collection, examples, embeddings, k, repeats, hnsw_ef):
+    search_params = profile.search_params(hnsw_ef=hnsw_ef)
+
+    search_latencies = []
+    recalls = []
+
+    for (question, reference_ids), embedding in zip(examples, embeddings):
+        for _ in range(repeats):
+            points, search_ms = timed(
+                hybrid_search, qdrant_client, collection, provider.vector_name, embedding, question, k,
+                search_params=search_params,
+            )
+            search_latencies.append(search_ms)
+        recalls.append(recall_at_k([point.payload["parent_asin"] for point in points], reference_ids))
+
+    points_count = qdrant_client.get_collection(collection).points_count
+    summary = latency_summary(search_latencies)
+
+    return {
+        "profile": profile.name,
+        "collection": collection,
+        "search_p50_ms": summary["p50_ms"],
+        "search_p99_ms": summary["p99_ms"],
+        f"recall@{k}": sum(recalls) / len(recalls),
+        "vector_ram_mb": points_count * profile.bytes_per_vector(provider.dimensions) / 1024 / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--qdrant-url", default="http://localhost:6333")
+    parser.add_argument("--source-collection", default=config.ITEMS_COLLECTION)
+    parser.add_argument("--profiles", nargs="+", default=list(STORAGE_PROFILES), choices=list(STORAGE_PROFILES))
+    parser.add_argument("--build", action="store_true", help="(Re)build the profile collections first")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--hnsw-ef", type=int, default=None)
+    parser.add_argument("--repeats", type=int, default=5, help="Timed searches per query")
+    parser.add_argument("--limit", type=int, default=None, help="Only use the first N eval examples")
+    args = parser.parse_args()
+
+    qdrant_client = QdrantClient(url=args.qdrant_url)
+    provider = items_embedding_provider()
+    examples = load_eval_examples(limit=args.limit)
+    embeddings, _ = provider.embed_queries([question for question, _ in examples])
+
+    rows = []
+    for profile in map(get_storage_profile, args.profiles):
+        # The float32 row is the collection the API serves today
+        collection = args.source_collection
+        if profile.name != "float32":
+            collection = profile_collection_name(args.source_collection, profile)
+            if args.build:
+                copy_collection_with_profile(qdrant_client, args.source_collection, collection, profile)
+
+        rows.append(benchmark_profile(qdrant_client, provider, profile, collection, examples, embeddings, args.k, args.repeats, args.hnsw_ef))
+
+    print(f"\n{len(examples)} queries x {args.repeats} repeats, k={args.k}, {provider.dimensions}-d vectors\n")
+    print_table(rows, list(rows[0].keys()))
+
+
+if __name__ == "__main__":
+    main()
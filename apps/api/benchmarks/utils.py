@@ -0,0 +1,59 @@
+import time
+
+import numpy as np
+from langsmith import Client
+from qdrant_client.models import Prefetch, FusionQuery, Document
+
+
+#### SHARED BENCHMARK HELPERS ####
+
+def load_eval_examples(dataset_name="rag-evaluation-dataset", limit=None):
+    """Return [(question, reference_context_ids)] from the LangSmith retriever eval dataset."""
+    ls_client = Client()
+
+    examples = []
+    for example in ls_client.list_examples(dataset_name=dataset_name, limit=limit):
+        examples.append((example.inputs["question"], example.outputs["reference_context_ids"]))
+
+    return examples
+
+
+def hybrid_search(qdrant_client, collection, vector_name, query_embedding, query, k, search_params=None, **kwargs):
+    """The items retriever's dense + BM25 RRF query, parameterised by collection and vector."""
+    return qdrant_client.query_points(
+        collection_name=collection,
+        prefetch=[
+            Prefetch(query=query_embedding, using=vector_name, params=search_params, limit=20),
+            Prefetch(query=Document(text=query, model="qdrant/bm25"), using="bm25", limit=20),
+        ],
+        query=FusionQuery(fusion="rrf"),
+        limit=k,
+        with_payload=["parent_asin"],
+        **kwargs,
+    ).points
+
+
+def recall_at_k(retrieved_ids, reference_ids):
+    if not reference_ids:
+        return 0.0
+
+    return len(set(retrieved_ids) & set(reference_ids)) / len(set(reference_ids))
+
+
+def timed(fn, *args, **kwargs):
+    """Call fn and return (result, elapsed_ms)."""
+    started_at = time.perf_counter()
+    result = fn(*args, **kwargs)
+
+    return result, (time.perf_counter() - started_at) * 1000
+
+
+def latency_summary(latencies_ms):
+    latencies_ms = np.asarray(latencies_ms)
+
+    return {
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+        "mean_ms": float(latencies_ms.mean()),
+    }
+
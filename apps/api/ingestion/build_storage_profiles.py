@@ -0,0 +1,45 @@
+"""Build copies of the items and reviews collections stored with other storage profiles.
+
+Profiles (see shared.storage_profiles):
+  float32      full vectors in RAM, Qdrant defaults
+  on-disk      vectors and payloads memory-mapped from disk
+  scalar-int8  int8 vectors in RAM, originals on disk for rescoring
+  binary       1-bit vectors in RAM, 3x oversampling rescored from disk
+
+Points are copied with their vectors, no re-embedding. Serve a copy by
+pointing ITEMS_COLLECTION / REVIEWS_COLLECTION at it and setting the matching
+ITEMS_STORAGE_PROFILE / REVIEWS_STORAGE_PROFILE, so retrieval sends the
+profile's SearchParams.
+"""
+import argparse
+
+from qdrant_client import QdrantClient
+
+from shared.storage_profiles import STORAGE_PROFILES, get_storage_profile
+from api.core.config import config
+from ingestion.qdrant_collections import copy_collection_with_profile
+
+
+def profile_collection_name(source_collection, profile):
+    return f"{source_collection}-{profile.name}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--qdrant-url", default="http://localhost:6333")
+    parser.add_argument("--collections", nargs="+", default=[config.ITEMS_COLLECTION, config.REVIEWS_COLLECTION])
+    parser.add_argument("--profiles", nargs="+", default=[name for name in STORAGE_PROFILES if name != "float32"], choices=list(STORAGE_PROFILES))
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    qdrant_client = QdrantClient(url=args.qdrant_url)
+
+    for source_collection in args.collections:
+        for profile in map(get_storage_profile, args.profiles):
+            target_collection = profile_collection_name(source_collection, profile)
+            copied = copy_collection_with_profile(qdrant_client, source_collection, target_collection, profile, args.batch_size)
+            print(f"\nBuilt {target_collection} with {copied} points ({profile.name})\n")
+
+
+if __name__ == "__main__":
+    main()
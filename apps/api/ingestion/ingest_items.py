@@ -0,0 +1,152 @@
+"""Stream Amazon item metadata from JSONL into the hybrid items collection.
+
+Each line is turned into the payload the notebooks built (description from
+title and features, first large image, price, ratings, parent_asin), plus
+main_category and the content hashes ingestion.reindex_items diffs against.
+Descriptions are embedded in large batches with the configured items model
+and given BM25 sparse vectors computed in a process pool. Batches are
+embedded and upserted on --concurrency threads with bounded read-ahead, so
+memory stays flat for any source size.
+
+Progress is checkpointed after every contiguous run of finished batches;
+rerunning the same command resumes after the last checkpoint. Point ids are
+the 1-based source line numbers, so resumed batches overwrite, not duplicate.
+"""
+import argparse
+import hashlib
+import json
+import os
+
+from qdrant_client import QdrantClient
+
+from shared.embedding_providers import items_embedding_provider
+from shared.storage_profiles import STORAGE_PROFILES, get_storage_profile
+from api.core.config import config
+from ingestion.qdrant_collections import create_items_collection, item_point, bump_collection_version
+from ingestion.streaming import read_jsonl, line_batches, Checkpoint, BM25Pool, run_batches
+
+
+def _float_or_none(value):
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def content_hash(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def with_content_hashes(payload):
+    """Add the hashes incremental re-indexing diffs against: one of the embedded
+    description, one of everything else in the payload."""
+    payload = {key: value for key, value in payload.items() if key not in ("description_hash", "payload_hash")}
+
+    return {
+        **payload,
+        "description_hash": content_hash(payload["description"]),
+        "payload_hash": content_hash(payload),
+    }
+
+
+def item_payload(record):
+    """The items payload for a raw metadata record, None for records without a parent_asin or any text.
+
+    An empty description would fail the whole embedding request of its batch.
+    """
+    description = f"{record.get('title') or ''} {' '.join(record.get('features') or [])}".strip()
+    if not record.get("parent_asin") or not description:
+        return None
+
+    images = record.get("images") or [{}]
+    rating_number = record.get("rating_number")
+
+    return with_content_hashes({
+        "description": description,
+        "image": images[0].get("large", ""),
+        "rating_number": int(rating_number) if rating_number is not None else None,
+        "price": _float_or_none(record.get("price")),
+        "average_rating": _float_or_none(record.get("average_rating")),
+        "parent_asin": record["parent_asin"],
+        "main_category": record.get("main_category"),
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="Item metadata JSONL file")
+    parser.add_argument("--qdrant-url", default="http://localhost:6333")
+    parser.add_argument("--collection", default=config.ITEMS_COLLECTION)
+    parser.add_argument("--storage-profile", default="float32", choices=list(STORAGE_PROFILES))
+    parser.add_argument("--recreate", action="store_true", help="Drop the collection and the checkpoint and start over")
+    parser.add_argument("--checkpoint", default=None, help="Defaults to <source>.<collection>.checkpoint.json")
+    parser.add_argument("--batch-size", type=int, default=256, help="Items per embedding request and upsert")
+    parser.add_argument("--concurrency", type=int, default=4, help="Batches embedded and upserted at once")
+    parser.add_argument("--bm25-processes", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    qdrant_client = QdrantClient(url=args.qdrant_url, timeout=60)
+    provider = items_embedding_provider()
+    checkpoint_path = args.checkpoint or f"{args.source}.{args.collection}.checkpoint.json"
+
+    if args.recreate and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    checkpoint = Checkpoint(checkpoint_path, os.path.abspath(args.source), args.collection)
+
+    create_items_collection(
+        qdrant_client, args.collection, provider,
+        recreate=args.recreate, profile=get_storage_profile(args.storage_profile),
+    )
+
+    if checkpoint.offset:
+        print(f"Resuming {args.collection} after line {checkpoint.offset} ({checkpoint.points} points already ingested)")
+
+    bm25_pool = BM25Pool(args.bm25_processes)
+
+    def _ingest(pairs):
+        items = []
+        for line_number, record in pairs:
+            payload = item_payload(record)
+            if payload is not None:
+                items.append((line_number + 1, payload))
+
+        if not items:
+            return 0
+
+        descriptions = [payload["description"] for _, payload in items]
+
+        # BM25 runs in a worker process while this thread waits on the embedding API
+        bm25_future = bm25_pool.submit(descriptions)
+        embeddings, _ = provider.embed_documents(descriptions)
+        sparse_vectors = bm25_pool.sparse_vectors(bm25_future)
+
+        qdrant_client.upsert(
+            collection_name=args.collection,
+            points=[
+                item_point(point_id, embedding, payload, provider, bm25=sparse_vector)
+                for (point_id, payload), embedding, sparse_vector in zip(items, embeddings, sparse_vectors)
+            ],
+            wait=True,
+        )
+
+        return len(items)
+
+    try:
+        ingested, elapsed = run_batches(
+            line_batches(read_jsonl(args.source, start=checkpoint.offset), args.batch_size, start=checkpoint.offset),
+            _ingest,
+            checkpoint,
+            args.concurrency,
+        )
+    finally:
+        bm25_pool.close()
+
+    bump_collection_version(qdrant_client, args.collection)
+    checkpoint.clear()
+
+    print(f"\nIngested {ingested} points into {args.collection} in {elapsed:.1f}s, {checkpoint.points} in total")
+
+
+if __name__ == "__main__":
+    main()
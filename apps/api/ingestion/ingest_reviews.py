@@ -0,0 +1,252 @@
+"""Stream Amazon reviews from JSONL into the reviews collection.
+
+Each review becomes "<title> <text>" as in the notebooks. Before anything is
+embedded, reviews are deduplicated per product:
+
+  exact duplicates   same normalized text for the same parent_asin
+  near duplicates    64-bit SimHash of word shingles within --near-duplicate-bits
+                     of a recent review of the same parent_asin
+
+Reviews longer than --chunk-words are split into overlapping word windows,
+one point per chunk. Chunks are embedded in batches through a dispatcher
+that keeps every worker under the --rpm / --tpm account limits, upserted in
+parallel and checkpointed like the items ingestion. Point ids are derived
+from the product, the normalized text and the chunk, so exact duplicates
+that slip past the bounded in-memory dedup still land on one point.
+"""
+import argparse
+import hashlib
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+import openai
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointStruct
+
+from shared.embedding_providers import get_embedding_provider
+from shared.storage_profiles import STORAGE_PROFILES, get_storage_profile
+from api.core.config import config
+from ingestion.qdrant_collections import create_reviews_collection, bump_collection_version
+from ingestion.streaming import read_jsonl, line_batches, Checkpoint, RateLimiter, run_batches
+
+
+# USD per million input tokens
+EMBEDDING_PRICES = {
+    "text-embedding-3-small": 0.02,
+    "text-embedding-3-large": 0.13,
+    "text-embedding-ada-002": 0.10,
+}
+
+_WORD = re.compile(r"\w+")
+
+
+#### DEDUPLICATION ####
+
+def normalize_review(text):
+    return " ".join(_WORD.findall(text.lower()))
+
+
+def simhash(text, shingle_size=3):
+    """64-bit SimHash over word shingles; near-identical texts differ in few bits."""
+    words = text.split()
+    shingles = [" ".join(words[i:i + shingle_size]) for i in range(max(1, len(words) - shingle_size + 1))]
+
+    hashes = np.array(
+        [int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "little") for shingle in shingles],
+        dtype=np.uint64,
+    )
+    bits = np.unpackbits(hashes.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    votes = bits.sum(axis=0) * 2 > len(shingles)
+
+    return int.from_bytes(np.packbits(votes, bitorder="little").tobytes(), "little")
+
+
+class ReviewDeduplicator:
+    """Remembers recent review fingerprints per parent_asin to drop exact and near duplicates.
+
+    Memory is bounded: only the most recently seen max_items products keep
+    their fingerprints, each at most max_per_item of them.
+    """
+
+    def __init__(self, near_duplicate_bits=3, max_items=100_000, max_per_item=200):
+        self.near_duplicate_bits = near_duplicate_bits
+        self.max_items = max_items
+        self.max_per_item = max_per_item
+        self.exact = 0
+        self.near = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def is_duplicate(self, parent_asin, normalized):
+        fingerprint = simhash(normalized)
+        text_hash = hashlib.blake2b(normalized.encode(), digest_size=8).digest()
+
+        with self._lock:
+            seen = self._items.get(parent_asin)
+            if seen is None:
+                seen = self._items[parent_asin] = []
+                if len(self._items) > self.max_items:
+                    self._items.popitem(last=False)
+            self._items.move_to_end(parent_asin)
+
+            for seen_hash, seen_fingerprint in seen:
+                if seen_hash == text_hash:
+                    self.exact += 1
+                    return True
+                if (seen_fingerprint ^ fingerprint).bit_count() <= self.near_duplicate_bits:
+                    self.near += 1
+                    return True
+
+            seen.append((text_hash, fingerprint))
+            if len(seen) > self.max_per_item:
+                seen.pop(0)
+
+        return False
+
+
+#### CHUNKING ####
+
+def chunk_words(text, chunk_words, overlap_words):
+    """Split text into windows of chunk_words words overlapping by overlap_words."""
+    if not 0 <= overlap_words < chunk_words:
+        raise ValueError(f"Chunk overlap must be at least 0 and below the chunk size, got {overlap_words} for {chunk_words} words")
+
+    words = text.split()
+    if len(words) <= chunk_words:
+        return [text]
+
+    step = chunk_words - overlap_words
+    return [" ".join(words[start:start + chunk_words]) for start in range(0, len(words) - overlap_words, step)]
+
+
+def review_point_id(parent_asin, normalized, chunk_index):
+    digest = hashlib.blake2b(normalized.encode(), digest_size=16).hexdigest()
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"review:{parent_asin}:{digest}:{chunk_index}"))
+
+
+#### EMBEDDING DISPATCH ####
+
+def embed_with_limits(provider, rate_limiter, texts, retries=5):
+    """Embed texts once the rate limiter allows it, backing off on rate limit errors."""
+    # Roughly four characters per token, only used to pace requests
+    rate_limiter.acquire(sum(len(text) for text in texts) // 4 + len(texts))
+
+    for attempt in range(retries):
+        try:
+            return provider.embed_documents(texts)
+        except (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError):
+            if attempt == retries - 1:
+                raise
+            time.sleep(2 ** attempt)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="Reviews JSONL file")
+    parser.add_argument("--qdrant-url", default="http://localhost:6333")
+    parser.add_argument("--collection", default=config.REVIEWS_COLLECTION)
+    parser.add_argument("--model", default="text-embedding-3-small")
+    parser.add_argument("--storage-profile", default="float32", choices=list(STORAGE_PROFILES))
+    parser.add_argument("--recreate", action="store_true", help="Drop the collection and the checkpoint and start over")
+    parser.add_argument("--checkpoint", default=None, help="Defaults to <source>.<collection>.checkpoint.json")
+    parser.add_argument("--batch-size", type=int, default=512, help="Reviews per embedding request and upsert")
+    parser.add_argument("--concurrency", type=int, default=8, help="Batches embedded and upserted at once")
+    parser.add_argument("--rpm", type=int, default=3000, help="Embedding requests per minute")
+    parser.add_argument("--tpm", type=int, default=1_000_000, help="Embedding tokens per minute")
+    parser.add_argument("--chunk-words", type=int, default=300)
+    parser.add_argument("--chunk-overlap-words", type=int, default=50)
+    parser.add_argument("--near-duplicate-bits", type=int, default=3, help="Max SimHash distance of a near duplicate, -1 disables")
+    args = parser.parse_args()
+
+    if not 0 <= args.chunk_overlap_words < args.chunk_words:
+        parser.error("--chunk-overlap-words must be at least 0 and below --chunk-words")
+
+    qdrant_client = QdrantClient(url=args.qdrant_url, timeout=60)
+    provider = get_embedding_provider(args.model)
+    checkpoint_path = args.checkpoint or f"{args.source}.{args.collection}.checkpoint.json"
+
+    if args.recreate and os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    checkpoint = Checkpoint(checkpoint_path, os.path.abspath(args.source), args.collection)
+
+    create_reviews_collection(
+        qdrant_client, args.collection, provider,
+        recreate=args.recreate, profile=get_storage_profile(args.storage_profile),
+    )
+
+    if checkpoint.offset:
+        print(f"Resuming {args.collection} after line {checkpoint.offset} ({checkpoint.points} points already ingested)")
+
+    deduplicator = ReviewDeduplicator(near_duplicate_bits=args.near_duplicate_bits)
+    rate_limiter = RateLimiter(args.rpm, args.tpm)
+    totals = {"reviews": 0, "chunks": 0, "input_tokens": 0}
+    lock = threading.Lock()
+
+    def _ingest(pairs):
+        chunks = []
+        reviews = 0
+
+        for _, record in pairs:
+            text = f"{record.get('title') or ''} {record.get('text') or ''}".strip()
+            parent_asin = record.get("parent_asin")
+            if not text or not parent_asin:
+                continue
+
+            reviews += 1
+            normalized = normalize_review(text)
+            if deduplicator.is_duplicate(parent_asin, normalized):
+                continue
+
+            for chunk_index, chunk in enumerate(chunk_words(text, args.chunk_words, args.chunk_overlap_words)):
+                chunks.append((
+                    review_point_id(parent_asin, normalized, chunk_index),
+                    {"text": chunk, "parent_asin": parent_asin, "rating": record.get("rating")},
+                ))
+
+        input_tokens = 0
+        if chunks:
+            embeddings, usage = embed_with_limits(provider, rate_limiter, [payload["text"] for _, payload in chunks])
+            input_tokens = usage.get("input_tokens", 0)
+
+            qdrant_client.upsert(
+                collection_name=args.collection,
+                points=[
+                    PointStruct(id=point_id, vector=embedding, payload=payload)
+                    for (point_id, payload), embedding in zip(chunks, embeddings)
+                ],
+                wait=True,
+            )
+
+        with lock:
+            totals["reviews"] += reviews
+            totals["chunks"] += len(chunks)
+            totals["input_tokens"] += input_tokens
+
+        return len(chunks)
+
+    ingested, elapsed = run_batches(
+        line_batches(read_jsonl(args.source, start=checkpoint.offset), args.batch_size, start=checkpoint.offset),
+        _ingest,
+        checkpoint,
+        args.concurrency,
+    )
+
+    bump_collection_version(qdrant_client, args.collection)
+    checkpoint.clear()
+
+    spend = totals["input_tokens"] / 1_000_000 * EMBEDDING_PRICES.get(args.model, 0.0)
+    print(f"\nIngested {ingested} points into {args.collection} in {elapsed:.1f}s")
+    print(f"reviews: {totals['reviews']} ({totals['reviews'] / elapsed:.0f}/s)")
+    print(f"dropped exact duplicates: {deduplicator.exact}, near duplicates: {deduplicator.near}")
+    print(f"chunks embedded: {totals['chunks']} ({totals['chunks'] / elapsed:.0f}/s)")
+    print(f"embedding tokens: {totals['input_tokens']}, spend: ${spend:.4f} ({args.model})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Inspect and create the payload indexes of the items and reviews collections.
+
+Without --create it only reports. For every index in the spec it prints the
+indexed type and point count, the number of distinct values in a payload
+sample, and the selectivity and exact-count latency of a representative
+filter (the most common value for keyword fields, >= median for numeric
+ones). Qdrant does not expose query plans, so the count latency is the plan
+signal: an unindexed field makes the count a full payload scan. Exits
+non-zero while a required index is missing, the same check the API runs at
+startup.
+"""
+import argparse
+import statistics
+import sys
+import time
+from collections import Counter
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import Filter, FieldCondition, MatchValue, Range, PayloadSchemaType
+
+from api.agents.utils.payload_indexes import payload_index_spec, missing_payload_indexes, ensure_payload_indexes
+from ingestion.reporting import print_table
+
+
+def sample_values(qdrant_client, collection, field, limit):
+    records, _ = qdrant_client.scroll(
+        collection_name=collection,
+        limit=limit,
+        with_payload=[field],
+        with_vectors=False,
+    )
+
+    return [record.payload[field] for record in records if record.payload.get(field) is not None]
+
+
+def sample_filter(index, values):
+    if not values:
+        return None, None
+
+    if index.schema == PayloadSchemaType.KEYWORD:
+        value = Counter(values).most_common(1)[0][0]
+        return f"== {value}", Filter(must=[FieldCondition(key=index.field, match=MatchValue(value=value))])
+
+    if index.schema not in (PayloadSchemaType.FLOAT, PayloadSchemaType.INTEGER):
+        return None, None
+
+    value = statistics.median(values)
+    return f">= {value:g}", Filter(must=[FieldCondition(key=index.field, range=Range(gte=value))])
+
+
+def inspect_index(qdrant_client, collection, index, payload_schema, points_count, sample_size):
+    existing = payload_schema.get(index.field)
+    values = sample_values(qdrant_client, collection, index.field, sample_size)
+    description, query_filter = sample_filter(index, values)
+
+    row = {
+        "collection": collection,
+        "field": index.field,
+        "expected": index.schema.value,
+        "indexed": existing.data_type.value if existing else "-",
+        "indexed_points": existing.points if existing and existing.points is not None else "-",
+        "required": index.required,
+        "distinct_in_sample": len(set(values)) if values else "-",
+        "sample_filter": description or "-",
+        "matches": "-",
+        "selectivity": "-",
+        "count_ms": "-",
+    }
+
+    if query_filter is not None:
+        started_at = time.perf_counter()
+        matches = qdrant_client.count(collection_name=collection, count_filter=query_filter, exact=True).count
+        row["count_ms"] = (time.perf_counter() - started_at) * 1000
+        row["matches"] = matches
+        row["selectivity"] = matches / points_count if points_count else 0.0
+
+    return row
+
+
+def report(qdrant_client, sample_size):
+    rows = []
+
+    for collection, indexes in payload_index_spec().items():
+        info = qdrant_client.get_collection(collection)
+        for index in indexes:
+            rows.append(inspect_index(qdrant_client, collection, index, info.payload_schema, info.points_count, sample_size))
+
+    print_table(rows, list(rows[0].keys()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--qdrant-url", default="http://localhost:6333")
+    parser.add_argument("--create", action="store_true", help="Create missing indexes before reporting")
+    parser.add_argument("--sample-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    qdrant_client = QdrantClient(url=args.qdrant_url)
+
+    if args.create:
+        for collection, index in ensure_payload_indexes(qdrant_client):
+            print(f"Created {index.schema.value} index on {collection}.{index.field}")
+
+    report(qdrant_client, args.sample_size)
+
+    missing = missing_payload_indexes(qdrant_client)
+    for collection, index in missing:
+        print(f"Missing {'required' if index.required else 'optional'} index {collection}.{index.field} ({index.schema.value})")
+
+    if any(index.required for _, index in missing):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
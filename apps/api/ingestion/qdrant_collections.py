@@ -0,0 +1,224 @@
+from datetime import datetime, timezone
+
+from qdrant_client.models import (
+    Document,
+    PointStruct,
+    SparseVectorParams,
+    Modifier,
+    CreateAlias,
+    CreateAliasOperation,
+    DeleteAlias,
+    DeleteAliasOperation,
+)
+
+from api.agents.utils.payload_indexes import ITEMS_PAYLOAD_INDEXES, REVIEWS_PAYLOAD_INDEXES
+from shared.storage_profiles import get_storage_profile
+
+
+#### COLLECTION VERSION ####
+
+def bump_collection_version(qdrant_client, collection_name):
+    """Stamp the collection with a new metadata version after its data changed.
+
+    Serving processes compare this stamp to invalidate retrieval results and
+    reload the product catalog.
+    """
+    version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    qdrant_client.update_collection(collection_name=collection_name, metadata={"version": version})
+
+    return version
+
+
+#### ALIASES ####
+
+def resolve_alias(qdrant_client, name):
+    """The collection an alias points to, or name itself when it is not an alias."""
+    aliases = {alias.alias_name: alias.collection_name for alias in qdrant_client.get_aliases().aliases}
+
+    return aliases.get(name, name)
+
+
+def swap_alias(qdrant_client, alias, collection_name):
+    """Point alias at collection_name in one atomic operation, returning the collection it pointed to before."""
+    previous = resolve_alias(qdrant_client, alias)
+
+    operations = [CreateAliasOperation(create_alias=CreateAlias(collection_name=collection_name, alias_name=alias))]
+    if previous != alias:
+        operations.insert(0, DeleteAliasOperation(delete_alias=DeleteAlias(alias_name=alias)))
+
+    qdrant_client.update_collection_aliases(change_aliases_operations=operations)
+
+    return previous if previous != alias else None
+
+
+#### STORAGE PROFILES ####
+
+def storage_profile_config(vectors_config, profile):
+    """create_collection arguments that store vectors_config (named or single VectorParams) with profile."""
+    if isinstance(vectors_config, dict):
+        vectors_config = {
+            name: params.model_copy(update={"on_disk": profile.vectors_on_disk})
+            for name, params in vectors_config.items()
+        }
+    else:
+        vectors_config = vectors_config.model_copy(update={"on_disk": profile.vectors_on_disk})
+
+    return dict(
+        vectors_config=vectors_config,
+        quantization_config=profile.quantization,
+        on_disk_payload=profile.payload_on_disk,
+    )
+
+
+def copy_collection_with_profile(qdrant_client, source_collection, target_collection, profile, batch_size=256):
+    """Rebuild target_collection from source_collection, vectors included, stored with profile.
+
+    Dense and sparse vectors are copied as they are, so building a profile
+    costs no embedding calls. Payload indexes are recreated with the same types.
+    """
+    source = qdrant_client.get_collection(source_collection)
+
+    if qdrant_client.collection_exists(target_collection):
+        qdrant_client.delete_collection(target_collection)
+
+    qdrant_client.create_collection(
+        collection_name=target_collection,
+        sparse_vectors_config=source.config.params.sparse_vectors,
+        **storage_profile_config(source.config.params.vectors, profile),
+    )
+    for field_name, index in source.payload_schema.items():
+        qdrant_client.create_payload_index(
+            collection_name=target_collection,
+            field_name=field_name,
+            field_schema=index.data_type,
+        )
+
+    offset = None
+    copied = 0
+    while True:
+        records, offset = qdrant_client.scroll(
+            collection_name=source_collection,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        if not records:
+            break
+
+        qdrant_client.upsert(
+            collection_name=target_collection,
+            points=[PointStruct(id=record.id, vector=record.vector, payload=record.payload) for record in records],
+            wait=True,
+        )
+        copied += len(records)
+        print(f"Copied {copied} points into {target_collection}")
+
+        if offset is None:
+            break
+
+    bump_collection_version(qdrant_client, target_collection)
+
+    return copied
+
+
+#### ITEMS COLLECTION ####
+
+def create_items_collection(qdrant_client, collection_name, provider, recreate=False, profile=None):
+    """Create a hybrid items collection: one dense vector for provider plus BM25 sparse vectors."""
+    if qdrant_client.collection_exists(collection_name):
+        if not recreate:
+            return False
+        qdrant_client.delete_collection(collection_name)
+
+    qdrant_client.create_collection(
+        collection_name=collection_name,
+        sparse_vectors_config={"bm25": SparseVectorParams(modifier=Modifier.IDF)},
+        **storage_profile_config({provider.vector_name: provider.vector_params()}, profile or get_storage_profile("float32")),
+    )
+    for index in ITEMS_PAYLOAD_INDEXES:
+        qdrant_client.create_payload_index(
+            collection_name=collection_name,
+            field_name=index.field,
+            field_schema=index.schema,
+        )
+
+    return True
+
+
+def item_point(point_id, embedding, payload, provider, bm25=None):
+    """Items point; BM25 is computed by qdrant-client from the description unless a precomputed sparse vector is given."""
+    return PointStruct(
+        id=point_id,
+        vector={
+            provider.vector_name: embedding,
+            "bm25": bm25 if bm25 is not None else Document(text=payload["description"], model="qdrant/bm25"),
+        },
+        payload=payload,
+    )
+
+
+def copy_items_collection(qdrant_client, provider, source_collection, target_collection, batch_size=256):
+    """Rebuild target_collection from source_collection with dense vectors from provider.
+
+    Payloads and BM25 sparse vectors are copied as they are, only the
+    descriptions are re-embedded. Points without a stored BM25 vector get one
+    computed from their description.
+    """
+    create_items_collection(qdrant_client, target_collection, provider, recreate=True)
+
+    offset = None
+    copied = 0
+    while True:
+        records, offset = qdrant_client.scroll(
+            collection_name=source_collection,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=["bm25"],
+        )
+        if not records:
+            break
+
+        embeddings, _ = provider.embed_documents([record.payload["description"] for record in records])
+
+        qdrant_client.upsert(
+            collection_name=target_collection,
+            points=[
+                item_point(record.id, embedding, record.payload, provider, bm25=(record.vector or {}).get("bm25"))
+                for record, embedding in zip(records, embeddings)
+            ],
+            wait=True,
+        )
+        copied += len(records)
+        print(f"Copied {copied} points into {target_collection}")
+
+        if offset is None:
+            break
+
+    bump_collection_version(qdrant_client, target_collection)
+
+    return copied
+
+
+#### REVIEWS COLLECTION ####
+
+def create_reviews_collection(qdrant_client, collection_name, provider, recreate=False, profile=None):
+    """Create a reviews collection: one unnamed dense vector and the parent_asin index grouped search needs."""
+    if qdrant_client.collection_exists(collection_name):
+        if not recreate:
+            return False
+        qdrant_client.delete_collection(collection_name)
+
+    qdrant_client.create_collection(
+        collection_name=collection_name,
+        **storage_profile_config(provider.vector_params(), profile or get_storage_profile("float32")),
+    )
+    for index in REVIEWS_PAYLOAD_INDEXES:
+        qdrant_client.create_payload_index(
+            collection_name=collection_name,
+            field_name=index.field,
+            field_schema=index.schema,
+        )
+
+    return True
@@ -0,0 +1,45 @@
+"""Build a variant of the items collection with dense vectors from another model or dimension.
+
+Payloads and BM25 vectors are copied from the source collection; descriptions
+are re-embedded with the chosen model, e.g. text-embedding-3-small at 256 or
+512 dimensions. Point the API at the result with ITEMS_COLLECTION,
+ITEMS_EMBEDDING_MODEL and ITEMS_EMBEDDING_DIMENSIONS.
+"""
+import argparse
+
+from qdrant_client import QdrantClient
+
+from shared.embedding_providers import get_embedding_provider
+from api.core.config import config
+from ingestion.qdrant_collections import copy_items_collection
+
+
+def variant_collection_name(source_collection, provider):
+    return f"{source_collection}-{provider.vector_name}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--qdrant-url", default="http://localhost:6333")
+    parser.add_argument("--model", default="text-embedding-3-small")
+    parser.add_argument("--dimensions", type=int, default=None)
+    parser.add_argument("--source-collection", default=config.ITEMS_COLLECTION)
+    parser.add_argument("--target-collection", default=None, help="Defaults to <source-collection>-<vector name>")
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    qdrant_client = QdrantClient(url=args.qdrant_url)
+    provider = get_embedding_provider(args.model, args.dimensions)
+    target_collection = args.target_collection or variant_collection_name(args.source_collection, provider)
+
+    copied = copy_items_collection(qdrant_client, provider, args.source_collection, target_collection, args.batch_size)
+
+    print(f"\nBuilt {target_collection} with {copied} points ({provider.dimensions}-d {provider.vector_name} vectors)")
+    print(
+        f"Serve it with ITEMS_COLLECTION={target_collection} ITEMS_EMBEDDING_MODEL={args.model}"
+        + (f" ITEMS_EMBEDDING_DIMENSIONS={args.dimensions}" if args.dimensions else "")
+    )
+
+
+if __name__ == "__main__":
+    main()
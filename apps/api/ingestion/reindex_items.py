@@ -0,0 +1,218 @@
+"""Incrementally re-index the items collection from a fresh metadata JSONL.
+
+The collection served under --alias (ITEMS_COLLECTION by default) is copied,
+vectors included, into a new <alias>-<timestamp> collection. The source is
+then diffed against it by parent_asin using the stored content hashes:
+
+  new ASIN                 embedded and inserted
+  description changed      re-embedded, point overwritten under its id
+  other payload changed    payload overwritten, vectors untouched
+  unchanged                skipped
+  missing from the source  deleted
+
+Finally the alias is swapped to the new collection in one atomic operation,
+so retrieval never sees a half-built index, and the previous collection is
+dropped unless --keep-previous is given.
+
+The first run against a collection that is not served through an alias yet
+needs --migrate: it moves the collection behind the alias, which leaves the
+name unavailable for the duration of one copy.
+"""
+import argparse
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointIdsList, OverwritePayloadOperation, SetPayload
+
+from shared.embedding_providers import items_embedding_provider
+from shared.storage_profiles import STORAGE_PROFILES, get_storage_profile
+from api.core.config import config
+from ingestion.ingest_items import item_payload, with_content_hashes
+from ingestion.qdrant_collections import (
+    resolve_alias,
+    swap_alias,
+    copy_collection_with_profile,
+    item_point,
+    bump_collection_version,
+)
+from ingestion.streaming import read_jsonl, line_batches, Checkpoint, BM25Pool, run_batches
+
+
+def indexed_items(qdrant_client, collection, batch_size=1024):
+    """Map parent_asin to (point id, description hash, payload hash) for every point.
+
+    Points written before hashes were stored get them computed from their payload.
+    """
+    items = {}
+    offset = None
+
+    while True:
+        records, offset = qdrant_client.scroll(
+            collection_name=collection,
+            limit=batch_size,
+            offset=offset,
+            with_payload=True,
+            with_vectors=False,
+        )
+
+        for record in records:
+            payload = record.payload
+            if "payload_hash" not in payload:
+                payload = with_content_hashes(payload)
+            items[payload["parent_asin"]] = (record.id, payload["description_hash"], payload["payload_hash"])
+
+        if offset is None:
+            break
+
+    return items
+
+
+def migrate_to_alias(qdrant_client, name, profile):
+    """Move a plain collection behind an alias of the same name."""
+    collection = versioned_collection_name(name)
+    copy_collection_with_profile(qdrant_client, name, collection, profile)
+    qdrant_client.delete_collection(name)
+    swap_alias(qdrant_client, name, collection)
+
+    return collection
+
+
+def versioned_collection_name(alias):
+    return f"{alias}-{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')}"
+
+
+def asin_point_id(asin):
+    """Id for a newly indexed ASIN; existing points keep their ids."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"parent_asin:{asin}"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="Item metadata JSONL file")
+    parser.add_argument("--qdrant-url", default="http://localhost:6333")
+    parser.add_argument("--alias", default=config.ITEMS_COLLECTION)
+    parser.add_argument("--storage-profile", default="float32", choices=list(STORAGE_PROFILES))
+    parser.add_argument("--migrate", action="store_true", help="Move a plain collection named --alias behind the alias first")
+    parser.add_argument("--keep-previous", action="store_true", help="Keep the collection the alias pointed to, for rollback")
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--bm25-processes", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    qdrant_client = QdrantClient(url=args.qdrant_url, timeout=60)
+    provider = items_embedding_provider()
+    profile = get_storage_profile(args.storage_profile)
+
+    current = resolve_alias(qdrant_client, args.alias)
+    if current == args.alias:
+        if not args.migrate:
+            raise SystemExit(f"{args.alias} is a collection, not an alias; rerun with --migrate to move it behind one")
+        current = migrate_to_alias(qdrant_client, args.alias, profile)
+        print(f"Moved {args.alias} behind an alias, now served from {current}")
+
+    target = versioned_collection_name(args.alias)
+    copy_collection_with_profile(qdrant_client, current, target, profile)
+
+    existing = indexed_items(qdrant_client, target)
+    print(f"Diffing against {len(existing)} indexed items in {target}")
+
+    seen = set()
+    counts = {"new": 0, "re-embedded": 0, "payload updated": 0, "unchanged": 0, "deleted": 0, "input tokens": 0}
+    lock = threading.Lock()
+    bm25_pool = BM25Pool(args.bm25_processes)
+
+    def _reindex(pairs):
+        to_embed = []
+        payload_updates = []
+        batch_counts = {"new": 0, "re-embedded": 0, "payload updated": 0, "unchanged": 0}
+
+        for _, record in pairs:
+            payload = item_payload(record)
+            if payload is None:
+                continue
+
+            asin = payload["parent_asin"]
+            indexed = existing.get(asin)
+
+            if indexed is None:
+                to_embed.append((asin_point_id(asin), payload))
+                batch_counts["new"] += 1
+            elif indexed[1] != payload["description_hash"]:
+                to_embed.append((indexed[0], payload))
+                batch_counts["re-embedded"] += 1
+            elif indexed[2] != payload["payload_hash"]:
+                payload_updates.append(OverwritePayloadOperation(overwrite_payload=SetPayload(payload=payload, points=[indexed[0]])))
+                batch_counts["payload updated"] += 1
+            else:
+                batch_counts["unchanged"] += 1
+
+            with lock:
+                seen.add(asin)
+
+        input_tokens = 0
+        if to_embed:
+            descriptions = [payload["description"] for _, payload in to_embed]
+            bm25_future = bm25_pool.submit(descriptions)
+            embeddings, usage = provider.embed_documents(descriptions)
+            sparse_vectors = bm25_pool.sparse_vectors(bm25_future)
+            input_tokens = usage.get("input_tokens", 0)
+
+            qdrant_client.upsert(
+                collection_name=target,
+                points=[
+                    item_point(point_id, embedding, payload, provider, bm25=sparse_vector)
+                    for (point_id, payload), embedding, sparse_vector in zip(to_embed, embeddings, sparse_vectors)
+                ],
+                wait=True,
+            )
+
+        if payload_updates:
+            qdrant_client.batch_update_points(collection_name=target, update_operations=payload_updates, wait=True)
+
+        with lock:
+            for key, value in batch_counts.items():
+                counts[key] += value
+            counts["input tokens"] += input_tokens
+
+        return len(pairs)
+
+    try:
+        run_batches(
+            line_batches(read_jsonl(args.source), args.batch_size),
+            _reindex,
+            Checkpoint(None, os.path.abspath(args.source), target),
+            args.concurrency,
+        )
+    except BaseException:
+        # Nothing is served from the half-built collection yet
+        qdrant_client.delete_collection(target)
+        raise
+    finally:
+        bm25_pool.close()
+
+    removed = [point_id for asin, (point_id, _, _) in existing.items() if asin not in seen]
+    for start in range(0, len(removed), args.batch_size):
+        qdrant_client.delete(
+            collection_name=target,
+            points_selector=PointIdsList(points=removed[start:start + args.batch_size]),
+            wait=True,
+        )
+    counts["deleted"] = len(removed)
+
+    bump_collection_version(qdrant_client, target)
+    previous = swap_alias(qdrant_client, args.alias, target)
+    print(f"\n{args.alias} now serves {target}")
+
+    if previous and not args.keep_previous:
+        qdrant_client.delete_collection(previous)
+        print(f"Dropped {previous}")
+
+    for key, value in counts.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+#### PLAIN-TEXT REPORTS ####
+
+def print_table(rows, columns):
+    """Print a list of dicts as an aligned plain-text table."""
+    widths = {
+        column: max(len(column), *(len(_format(row.get(column))) for row in rows))
+        for column in columns
+    }
+
+    print("  ".join(column.ljust(widths[column]) for column in columns))
+    print("  ".join("-" * widths[column] for column in columns))
+    for row in rows:
+        print("  ".join(_format(row.get(column)).ljust(widths[column]) for column in columns))
+
+
+def _format(value):
+    if isinstance(value, float):
+        return f"{value:.3f}"
+
+    return str(value)
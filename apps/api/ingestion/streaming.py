@@ -0,0 +1,220 @@
+import itertools
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from qdrant_client.models import SparseVector
+
+
+#### STREAMING SOURCES ####
+
+def read_jsonl(path, start=0):
+    """Yield (line_number, record) from a JSONL file, skipping the first start lines without parsing them."""
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(itertools.islice(f, start, None), start=start):
+            if line.strip():
+                yield line_number, json.loads(line)
+
+
+def line_batches(records, batch_size, start=0):
+    """Group (line_number, record) pairs into (first_line, end_line, pairs) batches.
+
+    Line ranges are contiguous from start (end_line exclusive), so skipped
+    blank lines never leave a gap the checkpoint offset cannot cross.
+    """
+    first_line = start
+    for batch in itertools.batched(records, batch_size):
+        end_line = batch[-1][0] + 1
+        yield first_line, end_line, list(batch)
+        first_line = end_line
+
+
+#### CHECKPOINTS ####
+
+class Checkpoint:
+    """Persists how many source lines are fully ingested, so a crashed run resumes after them.
+
+    Batches finish out of order when they run in parallel; the saved offset
+    only advances over a contiguous run of finished batches, so nothing is
+    skipped on resume. Re-ingesting the batches after the offset is safe
+    because point ids are derived from source lines.
+    """
+
+    def __init__(self, path, source, collection):
+        self.path = path
+        self.source = source
+        self.collection = collection
+        self.offset = 0
+        self.points = 0
+        self._finished = {}
+        self._lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+
+            if state["source"] != source or state["collection"] != collection:
+                raise ValueError(f"Checkpoint {path} belongs to {state['source']} -> {state['collection']}")
+
+            self.offset = state["offset"]
+            self.points = state["points"]
+
+    def finish(self, first_line, end_line, points):
+        with self._lock:
+            self._finished[first_line] = (end_line, points)
+
+            advanced = False
+            while self.offset in self._finished:
+                self.offset, batch_points = self._finished.pop(self.offset)
+                self.points += batch_points
+                advanced = True
+
+            if advanced:
+                self._save()
+
+    def _save(self):
+        if not self.path:
+            return
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "source": self.source,
+                "collection": self.collection,
+                "offset": self.offset,
+                "points": self.points,
+                "updated_at": time.time(),
+            }, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+#### BM25 WORKERS ####
+
+_bm25_model = None
+
+
+def _init_bm25():
+    global _bm25_model
+    from fastembed import SparseTextEmbedding
+
+    _bm25_model = SparseTextEmbedding(model_name="Qdrant/bm25")
+
+
+def _bm25_embed(texts):
+    return [(embedding.indices.tolist(), embedding.values.tolist()) for embedding in _bm25_model.embed(texts)]
+
+
+class BM25Pool:
+    """BM25 sparse vectors computed in worker processes, the same model Document(model="qdrant/bm25") runs in-process."""
+
+    def __init__(self, processes):
+        self._executor = ProcessPoolExecutor(max_workers=processes, initializer=_init_bm25)
+
+    def submit(self, texts):
+        """Start embedding texts in a worker, returning a future for sparse_vectors()."""
+        return self._executor.submit(_bm25_embed, texts)
+
+    @staticmethod
+    def sparse_vectors(future) -> list[SparseVector]:
+        return [SparseVector(indices=indices, values=values) for indices, values in future.result()]
+
+    def close(self):
+        self._executor.shutdown(cancel_futures=True)
+
+
+#### RATE LIMITING ####
+
+class RateLimiter:
+    """Token buckets for an API's requests and tokens per minute, shared by every worker thread.
+
+    acquire() blocks until both budgets allow the call, so parallel batches
+    stay under the account limits instead of failing on 429s.
+    """
+
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self._capacity = {"requests": requests_per_minute, "tokens": tokens_per_minute}
+        self._available = dict(self._capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated_at
+        self._updated_at = now
+
+        for key, capacity in self._capacity.items():
+            self._available[key] = min(capacity, self._available[key] + capacity * elapsed / 60)
+
+    def acquire(self, tokens):
+        # A batch larger than the whole per-minute budget still goes through once the bucket is full
+        tokens = min(tokens, self._capacity["tokens"])
+
+        while True:
+            with self._lock:
+                self._refill()
+
+                if self._available["requests"] >= 1 and self._available["tokens"] >= tokens:
+                    self._available["requests"] -= 1
+                    self._available["tokens"] -= tokens
+                    return
+
+                wait_seconds = max(
+                    (1 - self._available["requests"]) * 60 / self._capacity["requests"],
+                    (tokens - self._available["tokens"]) * 60 / self._capacity["tokens"],
+                )
+
+            time.sleep(max(wait_seconds, 0.01))
+
+
+#### BATCH RUNNER ####
+
+def run_batches(batches, process_batch, checkpoint, concurrency, report_every=10):
+    """Run process_batch(pairs) -> points over batches on concurrency threads, checkpointing as batches finish.
+
+    At most 2 x concurrency batches are read ahead of the workers, so memory
+    stays flat however large the source is. The first failure stops the run,
+    pending batches are cancelled and the checkpoint keeps the last
+    contiguous offset.
+    """
+    started_at = time.perf_counter()
+    done_batches = 0
+    ingested = 0
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        pending = {}
+
+        def _collect():
+            nonlocal done_batches, ingested
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in finished:
+                first_line, end_line = pending.pop(future)
+                points = future.result()
+                checkpoint.finish(first_line, end_line, points)
+                done_batches += 1
+                ingested += points
+
+                if done_batches % report_every == 0:
+                    elapsed = time.perf_counter() - started_at
+                    print(f"{ingested} points in {elapsed:.0f}s ({ingested / elapsed:.0f}/s), resume offset {checkpoint.offset}")
+
+        try:
+            for first_line, end_line, pairs in batches:
+                if len(pending) >= 2 * concurrency:
+                    _collect()
+                pending[executor.submit(process_batch, pairs)] = (first_line, end_line)
+
+            while pending:
+                _collect()
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            raise
+
+    return ingested, time.perf_counter() - started_at
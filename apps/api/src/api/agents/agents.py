@@ -2,15 +2,13 @@ from langsmith import traceable, get_current_run_tree
 
 from langchain_core.messages import convert_to_openai_messages, AIMessage
 from openai import OpenAI
-import instructor
 
-from api.agents.utils.prompt_management import prompt_template_config
+from api.agents.utils.prompt_management import render_memoized_prompt
+from api.agents.utils.llm_invocation import invoke_structured
 from api.agents.utils.utils import format_ai_message
 from pydantic import BaseModel, Field
 from typing import List
 
-from litellm import completion
-
 
 class ToolCall(BaseModel):
     name: str
@@ -68,12 +66,6 @@ class CoordinatorAgentResponse(BaseModel):
 )
 def product_qa_agent(state, models=["gpt-4.1", "groq/llama-3.3-70b-versatile"]) -> dict:
 
-   prompts = {}
-   for model in models:
-        prompts[model] = prompt_template_config("api/agents/prompts/product_qa_agent.yaml", model).render(
-            available_tools=state.product_qa_agent.available_tools
-        )
-
    messages = state.messages
 
    conversation = []
@@ -81,20 +73,16 @@ def product_qa_agent(state, models=["gpt-4.1", "groq/llama-3.3-70b-versatile"])
    for message in messages:
         conversation.append(convert_to_openai_messages(message))
 
-   client = instructor.from_litellm(completion)
-
-   for model in models:
-        try:
-            response, raw_response = client.chat.completions.create_with_completion(
-                model=model,
-                response_model=ProductQAAgentResponse,
-                messages=[{"role": "system", "content": prompts[model]}, *conversation],
-                temperature=0.5,
-            )
-            break
-        except Exception as e:
-            print(f"Error with model {model}: {e}")
-            continue
+   response, raw_response = invoke_structured(
+        "product_qa_agent",
+        models,
+        ProductQAAgentResponse,
+        lambda model: render_memoized_prompt(
+            "product_qa_agent", model,
+            static_variables={"available_tools": state.product_qa_agent.available_tools}
+        ),
+        conversation,
+   )
 
    current_run = get_current_run_tree()
 
@@ -130,14 +118,6 @@ def product_qa_agent(state, models=["gpt-4.1", "groq/llama-3.3-70b-versatile"])
 )
 def shopping_cart_agent(state, models=["gpt-4.1", "groq/llama-3.3-70b-versatile"]) -> dict:
 
-   prompts = {}
-   for model in models:
-        prompts[model] = prompt_template_config("api/agents/prompts/shopping_cart_agent.yaml", model).render(
-            available_tools=state.shopping_cart_agent.available_tools,
-            user_id=state.user_id,
-            cart_id=state.cart_id
-        )
-
    messages = state.messages
 
    conversation = []
@@ -145,20 +125,18 @@ def shopping_cart_agent(state, models=["gpt-4.1", "groq/llama-3.3-70b-versatile"
    for message in messages:
         conversation.append(convert_to_openai_messages(message))
 
-   client = instructor.from_litellm(completion)
-
-   for model in models:
-        try:
-            response, raw_response = client.chat.completions.create_with_completion(
-                model=model,
-                response_model=ShoppingCartAgentResponse,
-                messages=[{"role": "system", "content": prompts[model]}, *conversation],
-                temperature=0.5,
-            )
-            break
-        except Exception as e:
-            print(f"Error with model {model}: {e}")
-            continue
+   response, raw_response = invoke_structured(
+        "shopping_cart_agent",
+        models,
+        ShoppingCartAgentResponse,
+        lambda model: render_memoized_prompt(
+            "shopping_cart_agent", model,
+            static_variables={"available_tools": state.shopping_cart_agent.available_tools},
+            user_id=state.user_id,
+            cart_id=state.cart_id
+        ),
+        conversation,
+   )
 
    current_run = get_current_run_tree()
 
@@ -193,12 +171,6 @@ def shopping_cart_agent(state, models=["gpt-4.1", "groq/llama-3.3-70b-versatile"
 )
 def warehouse_manager_agent(state, models=["gpt-4.1", "groq/llama-3.3-70b-versatile"]) -> dict:
 
-   prompts = {}
-   for model in models:
-        prompts[model] = prompt_template_config("api/agents/prompts/warehouse_manager_agent.yaml", model).render(
-            available_tools=state.warehouse_manager_agent.available_tools
-        )
-
    messages = state.messages
 
    conversation = []
@@ -206,20 +178,16 @@ def warehouse_manager_agent(state, models=["gpt-4.1", "groq/llama-3.3-70b-versat
    for message in messages:
         conversation.append(convert_to_openai_messages(message))
 
-   client = instructor.from_litellm(completion)
-
-   for model in models:
-        try:
-            response, raw_response = client.chat.completions.create_with_completion(
-                model=model,
-                response_model=WarehouseManagerAgentResponse,
-                messages=[{"role": "system", "content": prompts[model]}, *conversation],
-                temperature=0.5,
-            )
-            break
-        except Exception as e:
-            print(f"Error with model {model}: {e}")
-            continue
+   response, raw_response = invoke_structured(
+        "warehouse_manager_agent",
+        models,
+        WarehouseManagerAgentResponse,
+        lambda model: render_memoized_prompt(
+            "warehouse_manager_agent", model,
+            static_variables={"available_tools": state.warehouse_manager_agent.available_tools}
+        ),
+        conversation,
+   )
 
    current_run = get_current_run_tree()
 
@@ -255,10 +223,6 @@ def warehouse_manager_agent(state, models=["gpt-4.1", "groq/llama-3.3-70b-versat
 )
 def coordinator_agent(state, models=["gpt-4.1", "groq/llama-3.3-70b-versatile"]):
 
-   prompts = {}
-   for model in models:
-        prompts[model] = prompt_template_config("api/agents/prompts/coordinator_agent.yaml", model).render()
-
    messages = state.messages
 
    conversation = []
@@ -266,20 +230,13 @@ def coordinator_agent(state, models=["gpt-4.1", "groq/llama-3.3-70b-versatile"])
    for message in messages:
         conversation.append(convert_to_openai_messages(message))
 
-   client = instructor.from_litellm(completion)
-
-   for model in models:
-        try:
-            response, raw_response = client.chat.completions.create_with_completion(
-                model=model,
-                response_model=CoordinatorAgentResponse,
-                messages=[{"role": "system", "content": prompts[model]}, *conversation],
-                temperature=0.5,
-            )
-            break
-        except Exception as e:
-            print(f"Error with model {model}: {e}")
-            continue
+   response, raw_response = invoke_structured(
+        "coordinator_agent",
+        models,
+        CoordinatorAgentResponse,
+        lambda model: render_memoized_prompt("coordinator_agent", model),
+        conversation,
+   )
 
    current_run = get_current_run_tree()
 
@@ -1,11 +1,15 @@
-import openai
-from qdrant_client import QdrantClient
 from langsmith import traceable, get_current_run_tree
 from pydantic import BaseModel, Field
-import instructor
-import numpy as np
-from qdrant_client.models import Filter, FieldCondition, MatchValue, Prefetch, FusionQuery, Document
-from api.agents.utils.prompt_management import prompt_template_config
+from qdrant_client.models import Prefetch, FusionQuery, Document
+from api.agents.utils.prompt_management import render_prompt
+from api.agents.utils.llm_clients import llm_clients
+from shared.embeddings import get_embedding
+from shared.embedding_providers import items_embedding_provider
+from shared.qdrant import get_qdrant_client
+from api.agents.utils.catalog import lookup_products
+from shared.storage_profiles import items_search_params
+from shared.retrieval import ITEMS_PAYLOAD_FIELDS
+from api.core.config import config
 
 
 class RAGUsedContext(BaseModel):
@@ -17,42 +21,21 @@ class RAGGenerationResponse(BaseModel):
     references: list[RAGUsedContext] = Field(description="List of items used to answer the question")
 
 
-@traceable(
-    name="embed_query",
-    run_type="embedding",
-    metadata={"ls_provider": "openai", "ls_model_name": "text-embedding-3-small"}
-)
-def get_embedding(text, model="text-embedding-3-small"):
-    response = openai.embeddings.create(
-        input=text,
-        model=model,
-    )
-
-    current_run = get_current_run_tree()
-
-    if current_run:
-        current_run.metadata["usage_metadata"] = {
-            "input_tokens": response.usage.prompt_tokens,
-            "total_tokens": response.usage.total_tokens,
-        }
-
-    return response.data[0].embedding
-
-
 @traceable(
     name="retrieve_data",
     run_type="retriever"
 )
 def retrieve_data(query, qdrant_client, k=5):
 
-    query_embedding = get_embedding(query)
+    query_embedding = get_embedding(query, model=config.ITEMS_EMBEDDING_MODEL, dimensions=config.ITEMS_EMBEDDING_DIMENSIONS)
 
     results = qdrant_client.query_points(
-        collection_name="Amazon-items-collection-01-hybrid-search",
+        collection_name=config.ITEMS_COLLECTION,
         prefetch=[
             Prefetch(
                 query=query_embedding,
-                using="text-embedding-3-small",
+                using=items_embedding_provider().vector_name,
+                params=items_search_params(),
                 limit=20
             ),
             Prefetch(
@@ -66,6 +49,8 @@ def retrieve_data(query, qdrant_client, k=5):
         ],
         query=FusionQuery(fusion="rrf"),
         limit=k,
+        with_payload=ITEMS_PAYLOAD_FIELDS,
+        with_vectors=False,
     )
 
     retrieved_context_ids = []
@@ -107,8 +92,7 @@ def process_context(context):
 )
 def build_prompt(preprocessed_context, question):
 
-    template = prompt_template_config("api/agents/prompts/retrieval_generation.yaml", "retrieval_generation")
-    prompt = template.render(preprocessed_context=preprocessed_context, question=question)
+    prompt = render_prompt("retrieval_generation", "retrieval_generation", preprocessed_context=preprocessed_context, question=question)
 
     return prompt
 
@@ -120,7 +104,7 @@ def build_prompt(preprocessed_context, question):
 )
 def generate_answer(prompt):
 
-    client = instructor.from_openai(openai.OpenAI())
+    client = llm_clients.instructor_openai()
 
     response, raw_response = client.chat.completions.create_with_completion(
         model="gpt-4.1-mini",
@@ -165,29 +149,16 @@ def rag_pipeline(question, qdrant_client, top_k=5):
 
 def rag_pipeline_wrapper(question, top_k=5):
 
-    qdrant_client = QdrantClient(url="http://qdrant:6333")
+    qdrant_client = get_qdrant_client()
 
     result = rag_pipeline(question, qdrant_client, top_k)
 
     used_context = []
-    dummy_vector = np.zeros(1536).tolist()
-
-    for item in result.get("references", []):
-        payload = qdrant_client.query_points(
-            collection_name="Amazon-items-collection-01-hybrid-search",
-            query=dummy_vector,
-            limit=1,
-            using="text-embedding-3-small",
-            with_payload=True,
-            query_filter=Filter(
-                must=[
-                    FieldCondition(
-                        key="parent_asin",
-                        match=MatchValue(value=item.id)
-                    )
-                ]
-            )
-        ).points[0].payload
+    references = result.get("references", [])
+    products = lookup_products([item.id for item in references])
+
+    for item in references:
+        payload = products.get(item.id, {})
         image_url = payload.get("image")
         price = payload.get("price")
         if image_url:
@@ -1,103 +1,13 @@
-import openai
-from langsmith import traceable, get_current_run_tree
-from qdrant_client import QdrantClient
-from qdrant_client.models import Prefetch, FusionQuery, Document, Filter, FieldCondition, MatchAny
-from qdrant_client.models import MatchValue
-
 import psycopg2
 from psycopg2.extras import RealDictCursor
-import numpy as np
-
-
-@traceable(
-    name="embed_query",
-    run_type="embedding",
-    metadata={"ls_provider": "openai", "ls_model_name": "text-embedding-3-small"}
-)
-def get_embedding(text, model="text-embedding-3-small"):
-    response = openai.embeddings.create(
-        input=text,
-        model=model,
-    )
-
-    current_run = get_current_run_tree()
-
-    if current_run:
-        current_run.metadata["usage_metadata"] = {
-            "input_tokens": response.usage.prompt_tokens,
-            "total_tokens": response.usage.total_tokens,
-        }
 
-    return response.data[0].embedding
+from shared.retrieval import retrieve_items_data, aretrieve_items_data, process_items_context, retrieve_reviews_data, aretrieve_reviews_data, process_reviews_context
+from api.agents.utils.catalog import lookup_products
 
 
 ### Item Description Retrieval Tool
 
 
-@traceable(
-    name="retrieve_data",
-    run_type="retriever"
-)
-def retrieve_items_data(query, k=5):
-
-    query_embedding = get_embedding(query)
-
-    qdrant_client = QdrantClient(url="http://qdrant:6333")
-
-    results = qdrant_client.query_points(
-        collection_name="Amazon-items-collection-01-hybrid-search",
-        prefetch=[
-            Prefetch(
-                query=query_embedding,
-                using="text-embedding-3-small",
-                limit=20
-            ),
-            Prefetch(
-                query=Document(
-                    text=query,
-                    model="qdrant/bm25"
-                ),
-                using="bm25",
-                limit=20
-            )
-        ],
-        query=FusionQuery(fusion="rrf"),
-        limit=k,
-    )
-
-    retrieved_context_ids = []
-    retrieved_context = []
-    similarity_scores = []
-    retrieved_context_ratings = []
-
-    for result in results.points:
-        retrieved_context_ids.append(result.payload["parent_asin"])
-        retrieved_context.append(result.payload["description"])
-        retrieved_context_ratings.append(result.payload["average_rating"])
-        similarity_scores.append(result.score)
-
-    return {
-        "retrieved_context_ids": retrieved_context_ids,
-        "retrieved_context": retrieved_context,
-        "retrieved_context_ratings": retrieved_context_ratings,
-        "similarity_scores": similarity_scores,
-    }
-
-
-@traceable(
-    name="format_retrieved_context",
-    run_type="prompt"
-)
-def process_items_context(context):
-
-    formatted_context = ""
-
-    for id, chunk, rating in zip(context["retrieved_context_ids"], context["retrieved_context"], context["retrieved_context_ratings"]):
-        formatted_context += f"- ID: {id}, rating: {rating}, description: {chunk}\n"
-
-    return formatted_context
-
-
 def get_formatted_items_context(query: str, top_k: int = 5) -> str:
 
     """Get the top k context, each representing an inventory item for a given query.
@@ -116,69 +26,14 @@ def get_formatted_items_context(query: str, top_k: int = 5) -> str:
     return formatted_context
 
 
-### Item Reviews Retrieval Tool
-
-
-@traceable(
-    name="retrieve_reviews_data",
-    run_type="retriever"
-)
-def retrieve_reviews_data(query, item_list, k=5):
-
-    query_embedding = get_embedding(query)
-
-    qdrant_client = QdrantClient(url="http://qdrant:6333")
-
-    results = qdrant_client.query_points(
-        collection_name="Amazon-items-collection-01-reviews",
-        prefetch=[
-            Prefetch(
-                query=query_embedding,
-                filter=Filter(
-                    must=[
-                        FieldCondition(
-                            key="parent_asin",
-                            match=MatchAny(
-                                any=item_list
-                            )
-                        )
-                    ]
-                ),
-                limit=20
-            )
-        ],
-        query=FusionQuery(fusion="rrf"),
-        limit=k
-    )
-
-    retrieved_context_ids = []
-    retrieved_context = []
-    similarity_scores = []
-
-    for result in results.points:
-        retrieved_context_ids.append(result.payload["parent_asin"])
-        retrieved_context.append(result.payload["text"])
-        similarity_scores.append(result.score)
-
-    return {
-        "retrieved_context_ids": retrieved_context_ids,
-        "retrieved_context": retrieved_context,
-        "similarity_scores": similarity_scores,
-    }
-
+async def aget_formatted_items_context(query: str, top_k: int = 5) -> str:
 
-@traceable(
-    name="format_retrieved_reviews_context",
-    run_type="prompt"
-)
-def process_reviews_context(context):
+    context = await aretrieve_items_data(query, top_k)
 
-    formatted_context = ""
+    return process_items_context(context)
 
-    for id, chunk in zip(context["retrieved_context_ids"], context["retrieved_context"]):
-        formatted_context += f"- ID: {id}, review: {chunk}\n"
 
-    return formatted_context
+### Item Reviews Retrieval Tool
 
 
 def get_formatted_reviews_context(query: str, item_list: list, top_k: int = 15) -> str:
@@ -200,6 +55,13 @@ def get_formatted_reviews_context(query: str, item_list: list, top_k: int = 15)
     return formatted_context
 
 
+async def aget_formatted_reviews_context(query: str, item_list: list, top_k: int = 15) -> str:
+
+    context = await aretrieve_reviews_data(query, item_list, top_k)
+
+    return process_reviews_context(context)
+
+
 #### Shopping Cart Agent Tools
 
 ### Add to Shopping Cart Tool
@@ -217,6 +79,13 @@ def add_to_shopping_cart(items: list[dict], user_id: str, cart_id: str) -> str:
         A list of the items added to the shopping cart.
     """
 
+    products = lookup_products([item['product_id'] for item in items])
+
+    # Without a product there is no price or image to store, let the agent correct the IDs instead
+    unknown_ids = [item['product_id'] for item in items if item['product_id'] not in products]
+    if unknown_ids:
+        return f"No items were added to the shopping cart, these product IDs were not found: {unknown_ids}."
+
     conn = psycopg2.connect(
         host="postgres",
         port=5432,
@@ -232,29 +101,7 @@ def add_to_shopping_cart(items: list[dict], user_id: str, cart_id: str) -> str:
             product_id = item['product_id']
             quantity = item['quantity']
 
-            qdrant_client = QdrantClient(url="http://qdrant:6333")
-
-            dummy_vector = np.zeros(1536).tolist()
-            payload = qdrant_client.query_points(
-                collection_name="Amazon-items-collection-01-hybrid-search",
-                prefetch=[
-                    Prefetch(
-                        query=dummy_vector,
-                        filter=Filter(
-                        must=[
-                            FieldCondition(
-                                key="parent_asin",
-                                match=MatchValue(value=product_id)
-                            )
-                        ]
-                    ),
-                        using="text-embedding-3-small",
-                        limit=20
-                    )
-                ],
-                query=FusionQuery(fusion="rrf"),
-                limit=1,
-            ).points[0].payload
+            payload = products[product_id]
 
             product_image_url = payload.get("image")
             price = payload.get("price")
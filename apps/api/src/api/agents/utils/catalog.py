@@ -0,0 +1,420 @@
+import logging
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+import numpy as np
+from langsmith import traceable
+from qdrant_client.models import Filter, FieldCondition, MatchAny
+
+from api.core.config import config
+from shared.qdrant import get_qdrant_client, get_async_qdrant_client, collection_version
+
+
+logger = logging.getLogger(__name__)
+
+
+#### PRODUCT LOOKUP ####
+
+# Payload fields the UI and the shopping cart need, everything else stays in Qdrant
+PRODUCT_FIELDS = ["parent_asin", "image", "price", "average_rating", "rating_number"]
+
+
+class ProductCache:
+    """Thread-safe LRU cache of product payloads by parent_asin with TTL eviction."""
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 600):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, asins: list[str]) -> tuple[dict, list[str]]:
+        """Return (found, missing) for a list of ASINs."""
+        found = {}
+        missing = []
+        now = time.monotonic()
+
+        with self._lock:
+            for asin in asins:
+                entry = self._entries.get(asin)
+
+                if entry is None or (self.ttl_seconds > 0 and entry[1] < now):
+                    self._entries.pop(asin, None)
+                    self.misses += 1
+                    missing.append(asin)
+                    continue
+
+                self._entries.move_to_end(asin)
+                self.hits += 1
+                found[asin] = entry[0]
+
+        return found, missing
+
+    def set_many(self, products: dict):
+        if self.max_size <= 0:
+            return
+
+        expires_at = time.monotonic() + self.ttl_seconds
+
+        with self._lock:
+            for asin, product in products.items():
+                self._entries[asin] = (product, expires_at)
+                self._entries.move_to_end(asin)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+product_cache = ProductCache(
+    max_size=config.PRODUCT_CACHE_MAX_SIZE,
+    ttl_seconds=config.PRODUCT_CACHE_TTL_SECONDS,
+)
+
+
+def _asin_filter(asins: list[str]) -> Filter:
+    return Filter(
+        must=[
+            FieldCondition(
+                key="parent_asin",
+                match=MatchAny(any=asins)
+            )
+        ]
+    )
+
+
+def fetch_products(qdrant_client, collection: str, asins: list[str]) -> dict:
+    """Fetch the product payloads for many ASINs with one filtered scroll, without vectors."""
+    products = {}
+    offset = None
+
+    while True:
+        points, offset = qdrant_client.scroll(
+            collection_name=collection,
+            scroll_filter=_asin_filter(asins),
+            limit=len(asins),
+            offset=offset,
+            with_payload=PRODUCT_FIELDS,
+            with_vectors=False,
+        )
+
+        for point in points:
+            products.setdefault(point.payload["parent_asin"], point.payload)
+
+        if offset is None:
+            return products
+
+
+async def afetch_products(async_qdrant_client, collection: str, asins: list[str]) -> dict:
+    products = {}
+    offset = None
+
+    while True:
+        points, offset = await async_qdrant_client.scroll(
+            collection_name=collection,
+            scroll_filter=_asin_filter(asins),
+            limit=len(asins),
+            offset=offset,
+            with_payload=PRODUCT_FIELDS,
+            with_vectors=False,
+        )
+
+        for point in points:
+            products.setdefault(point.payload["parent_asin"], point.payload)
+
+        if offset is None:
+            return products
+
+
+#### PRODUCT CATALOG ####
+
+class ProductCatalog:
+    """Compact, read-mostly copy of the product attributes for the whole items collection.
+
+    Each attribute is one typed column (array.array for numbers, a list for
+    image URLs) indexed by row, and ASINs are interned strings mapping to a
+    row. A refresh builds new columns and swaps them in with a single
+    assignment, so readers never lock and never see a half-built catalog.
+    Missing numbers are stored as NaN (prices, ratings) or -1 (rating counts).
+    """
+
+    def __init__(self):
+        self.version = None
+        self.source = None
+        self.loaded_at = None
+        self.hits = 0
+        self.misses = 0
+        self._columns = ({}, [], array("d"), array("d"), array("q"))
+
+    def replace(self, payloads, version: str, source: str):
+        index, images, prices, ratings, rating_counts = {}, [], array("d"), array("d"), array("q")
+
+        for payload in payloads:
+            asin = payload.get("parent_asin")
+            if not asin or asin in index:
+                continue
+
+            index[sys.intern(asin)] = len(images)
+            images.append(payload.get("image") or "")
+            prices.append(_to_float(payload.get("price")))
+            ratings.append(_to_float(payload.get("average_rating")))
+            rating_counts.append(int(payload["rating_number"]) if payload.get("rating_number") is not None else -1)
+
+        self._columns = (index, images, prices, ratings, rating_counts)
+        self.version = version
+        self.source = source
+        self.loaded_at = time.time()
+
+        return len(index)
+
+    def __len__(self):
+        return len(self._columns[0])
+
+    def get_many(self, asins: list[str]) -> tuple[dict, list[str]]:
+        """Return (found, missing) with found products in the same shape as their Qdrant payloads."""
+        index, images, prices, ratings, rating_counts = self._columns
+        found = {}
+        missing = []
+
+        for asin in asins:
+            row = index.get(asin)
+
+            if row is None:
+                missing.append(asin)
+                continue
+
+            found[asin] = {
+                "parent_asin": asin,
+                "image": images[row] or None,
+                "price": _from_float(prices[row]),
+                "average_rating": _from_float(ratings[row]),
+                "rating_number": rating_counts[row] if rating_counts[row] >= 0 else None,
+            }
+
+        self.hits += len(found)
+        self.misses += len(missing)
+
+        return found, missing
+
+    def save(self, path: str):
+        """Write the catalog to an .npz snapshot, atomically replacing any previous one."""
+        index, images, prices, ratings, rating_counts = self._columns
+        # A unique temp file per writer, so processes sharing the snapshot path never interleave writes
+        tmp = tempfile.NamedTemporaryFile(
+            dir=os.path.dirname(path) or ".", prefix=f"{os.path.basename(path)}.", suffix=".tmp", delete=False
+        )
+
+        try:
+            with tmp:
+                np.savez(
+                    tmp,
+                    version=np.array(self.version or ""),
+                    asins=np.array(list(index), dtype=str),
+                    images=np.array(images, dtype=str),
+                    prices=np.frombuffer(prices, dtype=np.float64),
+                    ratings=np.frombuffer(ratings, dtype=np.float64),
+                    rating_counts=np.frombuffer(rating_counts, dtype=np.int64),
+                )
+
+            os.replace(tmp.name, path)
+        except BaseException:
+            os.unlink(tmp.name)
+            raise
+
+    def load(self, path: str):
+        with np.load(path, allow_pickle=False) as snapshot:
+            index = {sys.intern(str(asin)): row for row, asin in enumerate(snapshot["asins"])}
+            images = [str(image) for image in snapshot["images"]]
+            prices = array("d", snapshot["prices"].astype(np.float64).tobytes())
+            ratings = array("d", snapshot["ratings"].astype(np.float64).tobytes())
+            rating_counts = array("q", snapshot["rating_counts"].astype(np.int64).tobytes())
+            version = str(snapshot["version"])
+
+        self._columns = (index, images, prices, ratings, rating_counts)
+        self.version = version
+        self.source = "snapshot"
+        self.loaded_at = time.time()
+
+        return len(index)
+
+    def stats(self) -> dict:
+        index, images, prices, ratings, rating_counts = self._columns
+        lookups = self.hits + self.misses
+
+        return {
+            "products": len(index),
+            "version": self.version,
+            "source": self.source,
+            "loaded_at": self.loaded_at,
+            "memory_bytes": (
+                sys.getsizeof(index)
+                + sys.getsizeof(images) + sum(sys.getsizeof(image) for image in images)
+                + sum(column.buffer_info()[1] * column.itemsize for column in (prices, ratings, rating_counts))
+            ),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _from_float(value: float):
+    return None if math.isnan(value) else value
+
+
+product_catalog = ProductCatalog()
+
+
+def scroll_products(qdrant_client, collection: str, page_size: int = 1024):
+    """Yield the product payloads of every point in the collection, without vectors."""
+    offset = None
+
+    while True:
+        points, offset = qdrant_client.scroll(
+            collection_name=collection,
+            limit=page_size,
+            offset=offset,
+            with_payload=PRODUCT_FIELDS,
+            with_vectors=False,
+        )
+
+        for point in points:
+            yield point.payload
+
+        if offset is None:
+            return
+
+
+def refresh_product_catalog(force: bool = False) -> bool:
+    """Reload the catalog from Qdrant if the collection's version stamp changed, returns True if it did."""
+    qdrant_client = get_qdrant_client()
+    version = collection_version(qdrant_client, config.ITEMS_COLLECTION)
+
+    if not force and version == product_catalog.version:
+        return False
+
+    loaded = product_catalog.replace(scroll_products(qdrant_client, config.ITEMS_COLLECTION), version, source="qdrant")
+    logger.info(f"Loaded {loaded} products into the catalog from {config.ITEMS_COLLECTION} ({version})")
+
+    if config.PRODUCT_CATALOG_SNAPSHOT_PATH:
+        try:
+            product_catalog.save(config.PRODUCT_CATALOG_SNAPSHOT_PATH)
+        except OSError as e:
+            logger.warning(f"Product catalog snapshot write failed: {e}")
+
+    return True
+
+
+def load_product_catalog():
+    """Load the catalog at startup, from the snapshot file when there is one, otherwise from Qdrant.
+
+    A snapshot may be stale, the background refresh replaces it as soon as
+    the collection's version stamp differs. Failures are logged and leave
+    lookups falling back to Qdrant.
+    """
+    path = config.PRODUCT_CATALOG_SNAPSHOT_PATH
+
+    if path and os.path.exists(path):
+        try:
+            loaded = product_catalog.load(path)
+            logger.info(f"Loaded {loaded} products into the catalog from {path}")
+            return
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Product catalog snapshot read failed: {e}")
+
+    try:
+        refresh_product_catalog(force=True)
+    except Exception as e:
+        logger.warning(f"Product catalog load failed: {e}")
+
+
+def schedule_catalog_refresh(interval_seconds: float) -> threading.Event:
+    """Check the collection version every interval_seconds on a daemon thread; set the returned event to stop."""
+    stop = threading.Event()
+
+    def _run():
+        while not stop.wait(interval_seconds):
+            try:
+                refresh_product_catalog()
+            except Exception as e:
+                logger.warning(f"Product catalog refresh failed: {e}")
+
+    threading.Thread(target=_run, name="product-catalog-refresh", daemon=True).start()
+
+    return stop
+
+
+def _lookup_in_memory(asins: list[str]) -> tuple[dict, list[str]]:
+    products, missing = product_catalog.get_many(asins)
+
+    if missing:
+        cached, missing = product_cache.get_many(missing)
+        products.update(cached)
+
+    return products, missing
+
+
+@traceable(
+    name="lookup_products",
+    run_type="retriever"
+)
+def lookup_products(asins: list[str]) -> dict:
+    """Return {parent_asin: payload} for the given ASINs, unknown ASINs are left out.
+
+    The in-process catalog answers first, ASINs it does not know yet (added
+    since the last refresh) go through the product cache and Qdrant.
+    """
+    products, missing = _lookup_in_memory(list(dict.fromkeys(asin for asin in asins if asin)))
+
+    if missing:
+        fetched = fetch_products(get_qdrant_client(), config.ITEMS_COLLECTION, missing)
+        product_cache.set_many(fetched)
+        products.update(fetched)
+
+    return products
+
+
+@traceable(
+    name="lookup_products",
+    run_type="retriever"
+)
+async def alookup_products(asins: list[str]) -> dict:
+    products, missing = _lookup_in_memory(list(dict.fromkeys(asin for asin in asins if asin)))
+
+    if missing:
+        fetched = await afetch_products(get_async_qdrant_client(), config.ITEMS_COLLECTION, missing)
+        product_cache.set_many(fetched)
+        products.update(fetched)
+
+    return products
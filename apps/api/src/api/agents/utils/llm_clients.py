@@ -0,0 +1,252 @@
+import asyncio
+import contextvars
+import importlib.util
+import logging
+import os
+import threading
+
+import httpx
+import instructor
+from openai import OpenAI, AsyncOpenAI
+from litellm import completion, acompletion
+from litellm.llms.custom_httpx.http_handler import HTTPHandler, AsyncHTTPHandler
+
+from api.core.config import config
+
+
+logger = logging.getLogger(__name__)
+
+
+#### CONNECTION TRACING ####
+
+class ConnectionCounter:
+    """Counts the connections and TLS handshakes an httpx client opens, from httpcore trace events."""
+
+    def __init__(self):
+        self.requests = 0
+        self.connections = 0
+        self.tls_handshakes = 0
+        self._lock = threading.Lock()
+
+    def _trace(self, event_name, info):
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self.connections += 1
+        elif event_name == "connection.start_tls.complete":
+            with self._lock:
+                self.tls_handshakes += 1
+
+    async def _atrace(self, event_name, info):
+        self._trace(event_name, info)
+
+    def on_request(self, request):
+        with self._lock:
+            self.requests += 1
+        request.extensions["trace"] = self._trace
+
+    async def aon_request(self, request):
+        with self._lock:
+            self.requests += 1
+        request.extensions["trace"] = self._atrace
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "connections": self.connections,
+                "tls_handshakes": self.tls_handshakes,
+                "reused_ratio": 1 - self.connections / self.requests if self.requests else 0.0,
+            }
+
+
+def http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def _http_client_options(http2: bool = None) -> dict:
+    http2 = config.LLM_HTTP2 if http2 is None else http2
+
+    if http2 and not http2_available():
+        logger.warning("LLM clients: HTTP/2 requested but h2 is not installed, using HTTP/1.1")
+        http2 = False
+
+    return dict(
+        http2=http2,
+        timeout=httpx.Timeout(config.LLM_TIMEOUT_SECONDS, connect=10),
+        limits=httpx.Limits(
+            max_connections=config.LLM_POOL_SIZE,
+            max_keepalive_connections=config.LLM_POOL_SIZE,
+            keepalive_expiry=config.LLM_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+    )
+
+
+def create_llm_http_client(http2: bool = None, counter: ConnectionCounter = None) -> httpx.Client:
+    """An httpx client with a keep-alive pool sized for LLM calls, HTTP/2 when h2 is installed."""
+    return httpx.Client(
+        **_http_client_options(http2),
+        event_hooks={"request": [counter.on_request]} if counter is not None else None,
+    )
+
+
+def create_async_llm_http_client(http2: bool = None, counter: ConnectionCounter = None) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        **_http_client_options(http2),
+        event_hooks={"request": [counter.aon_request]} if counter is not None else None,
+    )
+
+
+#### SHARED LLM CLIENTS ####
+
+def _provider(model: str) -> str:
+    """litellm's provider prefix: "groq/llama-3.3-70b-versatile" -> "groq", bare OpenAI names -> "openai"."""
+    return model.split("/", 1)[0] if "/" in model else "openai"
+
+
+class LLMClientRegistry:
+    """Process-wide LLM clients sharing one keep-alive connection pool per provider.
+
+    Building an OpenAI client or an instructor wrapper per call throws away
+    its connections, so every call pays TCP and TLS setup again. Clients
+    here are created on first use and reused; like the Qdrant client, a
+    forked worker builds its own instead of reusing the parent's sockets.
+
+    Async clients belong to the registry's own event loop, run on a
+    background thread, so sync callers can run cancellable concurrent LLM
+    calls on it with run().
+    """
+
+    def __init__(self):
+        self._reset()
+        # Factories build on each other (instructor -> OpenAI -> HTTP pool)
+        self._lock = threading.RLock()
+
+    def _reset(self):
+        self._http_clients = {}
+        self._async_http_clients = {}
+        self._counters = {}
+        self._clients = {}
+        self._loop = None
+        self._pid = os.getpid()
+
+    def _get(self, key, factory):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._reset()
+
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._clients[key] = factory()
+
+            return client
+
+    def http_client(self, provider: str) -> httpx.Client:
+        def _create():
+            counter = self._counters.setdefault(provider, ConnectionCounter())
+            http_client = self._http_clients[provider] = create_llm_http_client(counter=counter)
+            return http_client
+
+        return self._get(("http", provider), _create)
+
+    def async_http_client(self, provider: str) -> httpx.AsyncClient:
+        def _create():
+            counter = self._counters.setdefault(provider, ConnectionCounter())
+            http_client = self._async_http_clients[provider] = create_async_llm_http_client(counter=counter)
+            return http_client
+
+        return self._get(("async_http", provider), _create)
+
+    def openai(self) -> OpenAI:
+        return self._get("openai", lambda: OpenAI(http_client=self.http_client("openai")))
+
+    def instructor_openai(self) -> instructor.Instructor:
+        return self._get("instructor_openai", lambda: instructor.from_openai(self.openai()))
+
+    def instructor_litellm(self) -> instructor.Instructor:
+        """The instructor client agents call with model=..., pass litellm_client(model) as client=."""
+        return self._get("instructor_litellm", lambda: instructor.from_litellm(completion))
+
+    def litellm_client(self, model: str):
+        """The pooled client litellm should send a model's requests through."""
+        provider = _provider(model)
+
+        if provider == "openai":
+            return self.openai()
+
+        return self._get(("litellm", provider), lambda: HTTPHandler(client=self.http_client(provider)))
+
+    def async_openai(self) -> AsyncOpenAI:
+        return self._get("async_openai", lambda: AsyncOpenAI(http_client=self.async_http_client("openai")))
+
+    def async_instructor_litellm(self) -> instructor.AsyncInstructor:
+        return self._get("async_instructor_litellm", lambda: instructor.from_litellm(acompletion))
+
+    def async_litellm_client(self, model: str):
+        provider = _provider(model)
+
+        if provider == "openai":
+            return self.async_openai()
+
+        def _create():
+            handler = AsyncHTTPHandler()
+            handler.client = self.async_http_client(provider)
+            return handler
+
+        return self._get(("async_litellm", provider), _create)
+
+    def loop(self) -> asyncio.AbstractEventLoop:
+        def _create():
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="llm-clients-loop", daemon=True).start()
+            self._loop = loop
+            return loop
+
+        return self._get("loop", _create)
+
+    def run(self, coro):
+        """Run a coroutine on the registry's event loop and wait for its result.
+
+        The coroutine runs in a copy of the caller's context, so the LangSmith
+        run it is called from stays the parent of the runs it starts.
+        """
+        context = contextvars.copy_context()
+
+        async def _in_caller_context():
+            return await asyncio.get_running_loop().create_task(coro, context=context)
+
+        return asyncio.run_coroutine_threadsafe(_in_caller_context(), self.loop()).result()
+
+    def close(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                for http_client in self._http_clients.values():
+                    http_client.close()
+
+                if self._loop is not None:
+                    async def _aclose():
+                        for http_client in self._async_http_clients.values():
+                            await http_client.aclose()
+
+                    try:
+                        asyncio.run_coroutine_threadsafe(_aclose(), self._loop).result(timeout=5)
+                    except Exception as e:
+                        logger.warning(f"LLM clients: closing async clients failed: {e}")
+                    finally:
+                        self._loop.call_soon_threadsafe(self._loop.stop)
+
+            self._reset()
+
+    def stats(self) -> dict:
+        return {
+            "http2": config.LLM_HTTP2 and http2_available(),
+            "providers": {provider: counter.stats() for provider, counter in list(self._counters.items())},
+        }
+
+
+llm_clients = LLMClientRegistry()
@@ -0,0 +1,195 @@
+import asyncio
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from api.core.config import config
+from api.agents.utils.llm_clients import llm_clients
+
+
+#### MODEL LATENCY STATS ####
+
+class ModelStats:
+    """Per (agent, model) call outcomes and a sliding window of call latencies.
+
+    The hedge delay for a model is the configured percentile of its recent
+    latencies, so a hedge only fires for calls slower than, say, 95% of
+    recent ones. Until min_samples calls are recorded default_delay is used.
+    """
+
+    OUTCOMES = ("attempts", "hedges", "wins", "failures", "cancelled")
+
+    def __init__(self, window: int = 200, min_samples: int = 20, percentile: float = 95,
+                 default_delay: float = 4.0, min_delay: float = 0.5):
+        self.window = window
+        self.min_samples = min_samples
+        self.percentile = percentile
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _entry(self, name, model):
+        entry = self._entries.get((name, model))
+        if entry is None:
+            entry = self._entries[(name, model)] = {
+                **{outcome: 0 for outcome in self.OUTCOMES},
+                "latencies": deque(maxlen=self.window),
+            }
+
+        return entry
+
+    def record(self, name, model, outcome, latency_seconds: float = None):
+        with self._lock:
+            entry = self._entry(name, model)
+            entry[outcome] += 1
+            if latency_seconds is not None:
+                entry["latencies"].append(latency_seconds)
+
+    def hedge_delay(self, name, model) -> float:
+        with self._lock:
+            latencies = list(self._entry(name, model)["latencies"])
+
+        if len(latencies) < self.min_samples:
+            return self.default_delay
+
+        return max(self.min_delay, float(np.percentile(latencies, self.percentile)))
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = {key: {**entry, "latencies": list(entry["latencies"])} for key, entry in self._entries.items()}
+
+        stats = {}
+        for (name, model), entry in entries.items():
+            latencies = entry.pop("latencies")
+            launched = entry["attempts"] + entry["hedges"]
+            stats.setdefault(name, {})[model] = {
+                **entry,
+                "win_ratio": entry["wins"] / launched if launched else 0.0,
+                "p50_ms": float(np.percentile(latencies, 50)) * 1000 if latencies else None,
+                "p95_ms": float(np.percentile(latencies, 95)) * 1000 if latencies else None,
+                "hedge_delay_ms": self.hedge_delay(name, model) * 1000,
+            }
+
+        return {"hedging_enabled": config.LLM_HEDGING_ENABLED, "agents": stats}
+
+
+model_stats = ModelStats(
+    window=config.LLM_LATENCY_WINDOW,
+    min_samples=config.LLM_HEDGE_MIN_SAMPLES,
+    percentile=config.LLM_HEDGE_PERCENTILE,
+    default_delay=config.LLM_HEDGE_DEFAULT_DELAY_SECONDS,
+    min_delay=config.LLM_HEDGE_MIN_DELAY_SECONDS,
+)
+
+
+#### STRUCTURED LLM INVOCATION ####
+
+def _messages(system_prompt, model, conversation):
+    return [{"role": "system", "content": system_prompt(model)}, *conversation]
+
+
+def _invoke_sequential(name, models, response_model, system_prompt, conversation, temperature):
+    client = llm_clients.instructor_litellm()
+    error = None
+
+    for model in models:
+        messages = _messages(system_prompt, model, conversation)
+        started_at = time.perf_counter()
+        model_stats.record(name, model, "attempts")
+
+        try:
+            response, raw_response = client.chat.completions.create_with_completion(
+                model=model,
+                client=llm_clients.litellm_client(model),
+                response_model=response_model,
+                messages=messages,
+                temperature=temperature,
+            )
+        except Exception as e:
+            print(f"Error with model {model}: {e}")
+            model_stats.record(name, model, "failures")
+            error = e
+            continue
+
+        model_stats.record(name, model, "wins", time.perf_counter() - started_at)
+        return response, raw_response
+
+    raise error
+
+
+async def _ainvoke_hedged(name, models, response_model, system_prompt, conversation, temperature):
+    client = llm_clients.async_instructor_litellm()
+    remaining = list(models)
+    running = {}
+    error = None
+
+    def _launch(hedge):
+        model = remaining.pop(0)
+        task = asyncio.ensure_future(client.chat.completions.create_with_completion(
+            model=model,
+            client=llm_clients.async_litellm_client(model),
+            response_model=response_model,
+            messages=_messages(system_prompt, model, conversation),
+            temperature=temperature,
+        ))
+        running[task] = (model, time.perf_counter())
+        model_stats.record(name, model, "hedges" if hedge else "attempts")
+        return model
+
+    waiting_on = _launch(hedge=False)
+
+    try:
+        while running:
+            timeout = model_stats.hedge_delay(name, waiting_on) if remaining else None
+            done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+            if not done:
+                # Slower than the hedge delay: race the next model against it
+                waiting_on = _launch(hedge=True)
+                continue
+
+            for task in done:
+                model, started_at = running.pop(task)
+
+                if task.exception() is None:
+                    model_stats.record(name, model, "wins", time.perf_counter() - started_at)
+                    return task.result()
+
+                print(f"Error with model {model}: {task.exception()}")
+                model_stats.record(name, model, "failures")
+                error = task.exception()
+
+            if not running and remaining:
+                waiting_on = _launch(hedge=False)
+
+        raise error
+    finally:
+        for task, (model, started_at) in running.items():
+            task.cancel()
+            # The loser was at least this slow; without it the window would only keep the fast calls
+            model_stats.record(name, model, "cancelled", time.perf_counter() - started_at)
+
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+
+
+def invoke_structured(name, models, response_model, system_prompt, conversation, temperature=0.5):
+    """Get a validated response_model from the first model in models that answers.
+
+    system_prompt(model) renders the prompt for a model and is only called
+    when that model is tried. Models are tried in order, falling back on
+    errors. With LLM_HEDGING_ENABLED, a call that has not answered within the
+    model's hedge delay is raced against the next model: the first valid
+    response wins and the other call is cancelled. Returns (response,
+    raw_response).
+    """
+    if not models:
+        raise ValueError(f"No models to invoke for {name}")
+
+    if config.LLM_HEDGING_ENABLED and len(models) > 1:
+        return llm_clients.run(_ainvoke_hedged(name, models, response_model, system_prompt, conversation, temperature))
+
+    return _invoke_sequential(name, models, response_model, system_prompt, conversation, temperature)
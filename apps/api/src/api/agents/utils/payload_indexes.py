@@ -0,0 +1,84 @@
+from dataclasses import dataclass
+
+from qdrant_client.models import PayloadSchemaType
+
+from api.core.config import config
+
+
+#### PAYLOAD INDEXES ####
+
+@dataclass(frozen=True)
+class PayloadIndex:
+    field: str
+    schema: PayloadSchemaType
+    # Required indexes back filters the API runs on every request, startup fails without them
+    required: bool = False
+
+
+ITEMS_PAYLOAD_INDEXES = [
+    PayloadIndex("parent_asin", PayloadSchemaType.KEYWORD, required=True),
+    PayloadIndex("price", PayloadSchemaType.FLOAT, required=True),
+    PayloadIndex("average_rating", PayloadSchemaType.FLOAT, required=True),
+    PayloadIndex("rating_number", PayloadSchemaType.INTEGER),
+    PayloadIndex("main_category", PayloadSchemaType.KEYWORD),
+    # Brand filters match description text, a substring scan until this exists
+    PayloadIndex("description", PayloadSchemaType.TEXT),
+]
+
+REVIEWS_PAYLOAD_INDEXES = [
+    PayloadIndex("parent_asin", PayloadSchemaType.KEYWORD, required=True),
+    PayloadIndex("rating", PayloadSchemaType.FLOAT),
+]
+
+
+def payload_index_spec() -> dict[str, list[PayloadIndex]]:
+    """The payload indexes each served collection should have, keyed by collection name."""
+    return {
+        config.ITEMS_COLLECTION: ITEMS_PAYLOAD_INDEXES,
+        config.REVIEWS_COLLECTION: REVIEWS_PAYLOAD_INDEXES,
+    }
+
+
+def missing_payload_indexes(qdrant_client, required_only: bool = False) -> list[tuple[str, PayloadIndex]]:
+    """Return (collection, index) for every spec'd index the collection lacks or has with another type."""
+    missing = []
+
+    for collection, indexes in payload_index_spec().items():
+        payload_schema = qdrant_client.get_collection(collection).payload_schema
+
+        for index in indexes:
+            if required_only and not index.required:
+                continue
+
+            existing = payload_schema.get(index.field)
+            if existing is None or existing.data_type != index.schema:
+                missing.append((collection, index))
+
+    return missing
+
+
+def check_payload_indexes(qdrant_client):
+    """Raise if a required payload index is missing, filtered searches would otherwise be full scans."""
+    missing = missing_payload_indexes(qdrant_client, required_only=True)
+
+    if missing:
+        fields = ", ".join(f"{collection}.{index.field} ({index.schema.value})" for collection, index in missing)
+        raise RuntimeError(
+            f"Missing required Qdrant payload indexes: {fields}. "
+            f"Create them with `make manage-payload-indexes ARGS=--create`."
+        )
+
+
+def ensure_payload_indexes(qdrant_client) -> list[tuple[str, PayloadIndex]]:
+    """Create every missing payload index and wait for each to be built."""
+    missing = missing_payload_indexes(qdrant_client)
+
+    for collection, index in missing:
+        qdrant_client.create_payload_index(
+            collection_name=collection,
+            field_name=index.field,
+            field_schema=index.schema,
+            wait=True,
+        )
+
+    return missing
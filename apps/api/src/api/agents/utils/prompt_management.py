@@ -1,26 +1,489 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+
 import yaml
-from jinja2 import Template
+from jinja2 import Template, nodes
 from langsmith import Client
 
+from api.core.config import config
+from shared.single_flight import SingleFlight
+
+
+logger = logging.getLogger(__name__)
 
 ls_client = Client()
 
+PROMPTS_DIR = Path(__file__).resolve().parent.parent / "prompts"
+
+
+#### PROMPT TEMPLATE REGISTRY ####
+
+@dataclass
+class _PromptFile:
+    mtime_ns: int
+    templates: dict
+    metadata: dict
+    checked_at: float
+    # Prompt key -> variables its template only ever outputs as a bare {{ variable }}
+    plain_variables: dict = field(default_factory=dict)
+
+
+@dataclass
+class _PromptTimings:
+    loads: int = 0
+    load_ms: float = 0.0
+    last_load_ms: float = 0.0
+    renders: int = 0
+    render_ms: float = 0.0
+    reload_errors: int = 0
+    keys: list = field(default_factory=list)
+
+
+def _static_hash(variables) -> bytes:
+    # pickle is an order of magnitude cheaper than JSON for the tool descriptions
+    try:
+        serialized = pickle.dumps(variables, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        serialized = json.dumps(variables, sort_keys=True, default=str).encode()
+
+    return hashlib.blake2b(serialized, digest_size=16).digest()
+
+
+def _plain_variables(template: Template, source: str) -> frozenset:
+    """Variables a template only uses as a bare {{ variable }}, never in a filter, test, condition or loop."""
+    tree = template.environment.parse(source)
+
+    plain = {
+        id(node) for output in tree.find_all(nodes.Output)
+        for node in output.nodes if isinstance(node, nodes.Name)
+    }
+    names = list(tree.find_all(nodes.Name))
+
+    return frozenset(
+        {node.name for node in names if id(node) in plain}
+        - {node.name for node in names if id(node) not in plain}
+    )
+
+
+class PromptRegistry:
+    """Compiled Jinja templates of the YAML prompt files, loaded once per file version.
+
+    A file is identified by a name under prompts_dir ("product_qa_agent") or
+    a path to a YAML file. Its mtime is re-checked at most every
+    reload_check_seconds (0 checks on every lookup, a negative value never
+    does); only a changed mtime re-reads and re-compiles the file. A file
+    that fails to parse on reload keeps serving its previous templates.
+    """
+
+    def __init__(self, prompts_dir: Path = PROMPTS_DIR, reload_check_seconds: float = 1.0, rendered_max_size: int = 256):
+        self.prompts_dir = Path(prompts_dir)
+        self.reload_check_seconds = reload_check_seconds
+        self.rendered_max_size = rendered_max_size
+        self.rendered_hits = 0
+        self.rendered_misses = 0
+        self._files = {}
+        self._timings = {}
+        self._paths = {}
+        self._rendered = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, name) -> Path:
+        path = self._paths.get(name)
+        if path is not None:
+            return path
+
+        path = Path(name)
+        if path.suffix in (".yaml", ".yml"):
+            path = path.resolve()
+        else:
+            path = (self.prompts_dir / f"{name}.yaml").resolve()
+
+        self._paths[name] = path
+        return path
+
+    def _load(self, path: Path, mtime_ns: int) -> _PromptFile:
+        started_at = time.perf_counter()
+
+        with open(path, "r") as file:
+            content = yaml.safe_load(file)
+
+        templates = {key: Template(template) for key, template in content["prompts"].items()}
+        prompt_file = _PromptFile(
+            mtime_ns=mtime_ns,
+            templates=templates,
+            metadata=content.get("metadata") or {},
+            checked_at=time.monotonic(),
+            plain_variables={
+                key: _plain_variables(templates[key], template) for key, template in content["prompts"].items()
+            },
+        )
+        elapsed_ms = (time.perf_counter() - started_at) * 1000
+
+        with self._lock:
+            self._files[path] = prompt_file
+            timings = self._timings.setdefault(path.stem, _PromptTimings())
+            timings.loads += 1
+            timings.load_ms += elapsed_ms
+            timings.last_load_ms = elapsed_ms
+            timings.keys = sorted(prompt_file.templates)
+
+        return prompt_file
+
+    def load_all(self) -> int:
+        """Load and compile every prompt file under prompts_dir, raising on the first broken one."""
+        paths = sorted(self.prompts_dir.glob("*.yaml"))
+        for path in paths:
+            path = path.resolve()
+            self._load(path, os.stat(path).st_mtime_ns)
+
+        return len(paths)
+
+    def _prompt_file(self, name) -> _PromptFile:
+        path = self._path(name)
+        prompt_file = self._files.get(path)
+
+        if prompt_file is None:
+            return self._load(path, os.stat(path).st_mtime_ns)
+
+        if self.reload_check_seconds < 0 or time.monotonic() - prompt_file.checked_at < self.reload_check_seconds:
+            return prompt_file
+
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError as e:
+            logger.warning(f"Prompt registry: cannot stat {path}, serving the loaded version: {e}")
+            mtime_ns = prompt_file.mtime_ns
+
+        prompt_file.checked_at = time.monotonic()
+        if mtime_ns == prompt_file.mtime_ns:
+            return prompt_file
+
+        try:
+            prompt_file = self._load(path, mtime_ns)
+            logger.info(f"Prompt registry: reloaded {path.name}")
+        except Exception as e:
+            # Not retried until the file changes again
+            prompt_file.mtime_ns = mtime_ns
+            with self._lock:
+                self._timings.setdefault(path.stem, _PromptTimings()).reload_errors += 1
+            logger.warning(f"Prompt registry: reloading {path} failed, serving the previous version: {e}")
+
+        return prompt_file
+
+    def template(self, name, prompt_key) -> Template:
+        return self._prompt_file(name).templates[prompt_key]
+
+    def render(self, name, prompt_key, **variables) -> str:
+        template = self.template(name, prompt_key)
+
+        started_at = time.perf_counter()
+        prompt = template.render(**variables)
+        elapsed_ms = (time.perf_counter() - started_at) * 1000
+
+        with self._lock:
+            timings = self._timings.setdefault(self._path(name).stem, _PromptTimings())
+            timings.renders += 1
+            timings.render_ms += elapsed_ms
+
+        return prompt
+
+    def render_memoized(self, name, prompt_key, static_variables=None, **variables) -> str:
+        """Render a prompt whose static_variables rarely change, substituting only the per-call variables.
+
+        The template is rendered once per (file version, prompt key, hash of
+        static_variables) with a placeholder for each per-call variable,
+        which must be used as a plain {{ variable }}. Templates that use one
+        otherwise, in a filter, test, {% if %} or {% for %}, are found by
+        parsing them at load time and always rendered in full.
+        """
+        static_variables = static_variables or {}
+        prompt_file = self._prompt_file(name)
+        static_hash = _static_hash(static_variables)
+        key = (self._path(name), prompt_key, prompt_file.mtime_ns, static_hash, tuple(sorted(variables)))
+        placeholders = {variable: f"\x00{variable}\x00" for variable in variables}
+
+        with self._lock:
+            rendered = self._rendered.get(key)
+            if rendered is None:
+                self.rendered_misses += 1
+            else:
+                self._rendered.move_to_end(key)
+                self.rendered_hits += 1
+
+        if rendered is None:
+            if not prompt_file.plain_variables.get(prompt_key, frozenset()).issuperset(variables):
+                rendered = False
+            else:
+                rendered = self.render(name, prompt_key, **static_variables, **placeholders)
+                if not all(placeholder in rendered for placeholder in placeholders.values()):
+                    rendered = False
+
+            if self.rendered_max_size > 0:
+                with self._lock:
+                    self._rendered[key] = rendered
+                    while len(self._rendered) > self.rendered_max_size:
+                        self._rendered.popitem(last=False)
+
+        if rendered is False:
+            return self.render(name, prompt_key, **static_variables, **variables)
+
+        for variable, value in variables.items():
+            rendered = rendered.replace(placeholders[variable], str(value))
+
+        return rendered
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.rendered_hits + self.rendered_misses
+            return {
+                "prompts_dir": str(self.prompts_dir),
+                "rendered": {
+                    "size": len(self._rendered),
+                    "max_size": self.rendered_max_size,
+                    "hits": self.rendered_hits,
+                    "misses": self.rendered_misses,
+                    "hit_ratio": self.rendered_hits / lookups if lookups else 0.0,
+                },
+                "files": {
+                    name: {
+                        "keys": timings.keys,
+                        "loads": timings.loads,
+                        "last_load_ms": round(timings.last_load_ms, 3),
+                        "avg_load_ms": round(timings.load_ms / timings.loads, 3) if timings.loads else 0.0,
+                        "reload_errors": timings.reload_errors,
+                        "renders": timings.renders,
+                        "avg_render_ms": round(timings.render_ms / timings.renders, 3) if timings.renders else 0.0,
+                    }
+                    for name, timings in self._timings.items()
+                },
+            }
+
+
+prompt_registry = PromptRegistry(
+    reload_check_seconds=config.PROMPT_RELOAD_CHECK_SECONDS,
+    rendered_max_size=config.PROMPT_RENDER_CACHE_MAX_SIZE,
+)
+
+
 def prompt_template_config(yaml_file, prompt_key):
 
-    with open(yaml_file, 'r') as file:
-        config = yaml.safe_load(file)
+    return prompt_registry.template(yaml_file, prompt_key)
+
+
+def render_prompt(name, prompt_key, **variables):
+
+    return prompt_registry.render(name, prompt_key, **variables)
+
+
+def render_memoized_prompt(name, prompt_key, static_variables=None, **variables):
+
+    return prompt_registry.render_memoized(name, prompt_key, static_variables, **variables)
+
+
+#### LANGSMITH PROMPT CACHE ####
+
+@dataclass
+class _PulledPrompt:
+    template_content: str
+    commit_hash: str | None
+    fetched_at: float
+    template: Template = None
+
+    def __post_init__(self):
+        if self.template is None:
+            self.template = Template(self.template_content)
+
+
+_COMMIT_HASH = re.compile(r"[0-9a-f]{8,64}")
+
+
+def _is_pinned(identifier: str) -> bool:
+    # "name:<commit hash>" never changes, "name" and "name:<tag>" can
+    _, _, ref = identifier.rpartition(":")
+    return ":" in identifier and _COMMIT_HASH.fullmatch(ref) is not None
+
+
+class RemotePromptCache:
+    """Prompts pulled from the LangSmith prompt registry, served from memory and refreshed in the background.
+
+    A prompt is pulled over the network only on its first use; concurrent
+    first uses share one pull. After ttl_seconds the cached version keeps
+    being served while a background pull refreshes it, and a failed refresh
+    keeps the last known version. Prompts pinned to a commit hash
+    ("name:1a2b3c4d") never change and are never refreshed.
+
+    With a path, every pulled version is written to a JSON snapshot that is
+    loaded on start, so a cold start during a LangSmith outage still serves
+    the last known prompts.
+    """
+
+    def __init__(self, client, ttl_seconds: float = 300, path: str = "", pins: dict | None = None):
+        self.client = client
+        self.ttl_seconds = ttl_seconds
+        self.path = path
+        self.pins = pins or {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.pulls = 0
+        self.pull_errors = 0
+        self._entries = {}
+        self._refreshing = set()
+        self._flight = SingleFlight("langsmith_prompts")
+        self._lock = threading.Lock()
+
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def identifier(self, prompt_name: str, commit_hash: str | None = None) -> str:
+        """prompt_name pinned to commit_hash, else to its PROMPT_REGISTRY_PINS entry, else its latest commit."""
+        if ":" in prompt_name:
+            return prompt_name
+
+        commit_hash = commit_hash or self.pins.get(prompt_name)
+
+        return f"{prompt_name}:{commit_hash}" if commit_hash else prompt_name
+
+    def _pull(self, identifier: str) -> _PulledPrompt:
+        try:
+            prompt = self.client.pull_prompt(identifier)
+        except Exception:
+            with self._lock:
+                self.pull_errors += 1
+            raise
+
+        metadata = getattr(prompt, "metadata", None) or {}
+        pulled = _PulledPrompt(
+            template_content=prompt.messages[0].prompt.template,
+            commit_hash=metadata.get("lc_hub_commit_hash"),
+            fetched_at=time.time(),
+        )
+
+        with self._lock:
+            self.pulls += 1
+            self._entries[identifier] = pulled
+
+        if self.path:
+            try:
+                self.save(self.path)
+            except OSError as e:
+                logger.warning(f"Prompt cache: writing {self.path} failed: {e}")
+
+        return pulled
+
+    def _refresh(self, identifier: str):
+        try:
+            self._flight.do(identifier, lambda: self._pull(identifier))
+        except Exception as e:
+            logger.warning(f"Prompt cache: refreshing {identifier} failed, serving the cached version: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(identifier)
+
+    def get(self, prompt_name: str, commit_hash: str | None = None) -> Template:
+        identifier = self.identifier(prompt_name, commit_hash)
+        pulled = self._entries.get(identifier)
+
+        if pulled is None:
+            pulled, _ = self._flight.do(identifier, lambda: self._pull(identifier))
+            return pulled.template
+
+        stale = not _is_pinned(identifier) and time.time() - pulled.fetched_at > self.ttl_seconds
+
+        with self._lock:
+            if not stale:
+                self.hits += 1
+                return pulled.template
+
+            self.stale_hits += 1
+            if identifier in self._refreshing:
+                return pulled.template
+            self._refreshing.add(identifier)
+
+        threading.Thread(target=self._refresh, args=(identifier,), name="prompt-cache-refresh", daemon=True).start()
+
+        return pulled.template
+
+    def save(self, path: str):
+        """Write every cached prompt to a JSON snapshot, atomically replacing any previous one."""
+        with self._lock:
+            snapshot = {
+                identifier: {
+                    "template": pulled.template_content,
+                    "commit_hash": pulled.commit_hash,
+                    "fetched_at": pulled.fetched_at,
+                }
+                for identifier, pulled in self._entries.items()
+            }
+
+        # A unique temp file per writer, so worker processes sharing the snapshot path never interleave writes
+        tmp = tempfile.NamedTemporaryFile(
+            "w", dir=os.path.dirname(path) or ".", prefix=f"{os.path.basename(path)}.", suffix=".tmp", delete=False
+        )
+
+        try:
+            with tmp:
+                json.dump(snapshot, tmp)
+
+            os.replace(tmp.name, path)
+        except BaseException:
+            os.unlink(tmp.name)
+            raise
+
+    def load(self, path: str) -> int:
+        try:
+            with open(path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Prompt cache: cannot read {path}, starting empty: {e}")
+            return 0
 
-    template_content = config['prompts'][prompt_key]
+        with self._lock:
+            for identifier, entry in snapshot.items():
+                self._entries[identifier] = _PulledPrompt(
+                    template_content=entry["template"],
+                    commit_hash=entry.get("commit_hash"),
+                    fetched_at=entry["fetched_at"],
+                )
 
-    template = Template(template_content)
+        return len(snapshot)
 
-    return template
+    def stats(self) -> dict:
+        with self._lock:
+            now = time.time()
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "pulls": self.pulls,
+                "pull_errors": self.pull_errors,
+                "refreshing": len(self._refreshing),
+                "prompts": {
+                    identifier: {
+                        "commit_hash": pulled.commit_hash,
+                        "age_seconds": round(now - pulled.fetched_at, 1),
+                    }
+                    for identifier, pulled in self._entries.items()
+                },
+            }
 
 
-def prompt_template_registry(prompt_name):
+remote_prompt_cache = RemotePromptCache(
+    ls_client,
+    ttl_seconds=config.PROMPT_REGISTRY_TTL_SECONDS,
+    path=config.PROMPT_REGISTRY_CACHE_PATH,
+    pins=config.PROMPT_REGISTRY_PINS,
+)
 
-    template_content = ls_client.pull_prompt(prompt_name).messages[0].prompt.template
 
-    template = Template(template_content)
+def prompt_template_registry(prompt_name, commit_hash=None):
 
-    return template
\ No newline at end of file
+    return remote_prompt_cache.get(prompt_name, commit_hash)
@@ -4,6 +4,13 @@ from api.api.models import RAGRequest, RAGResponse, RAGUsedContext, FeedbackRequ
 
 from api.agents.graph import rag_agent_stream_wrapper
 from api.api.processors.submit_feedback import submit_feedback
+from shared.embeddings import embedding_cache, embedding_store, embedding_batcher, embedding_flight
+from shared.retrieval import hybrid_query_flight
+from api.agents.utils.catalog import product_cache, product_catalog
+from shared.retrieval_cache import retrieval_cache
+from api.agents.utils.prompt_management import prompt_registry, remote_prompt_cache
+from api.agents.utils.llm_clients import llm_clients
+from api.agents.utils.llm_invocation import model_stats
 import logging
 
 
@@ -15,9 +22,10 @@ logger = logging.getLogger(__name__)
 
 rag_router = APIRouter()
 feedback_router = APIRouter()
+stats_router = APIRouter()
 
 @rag_router.post("/")
-def rag(
+async def rag(
     request: Request,
     payload: RAGRequest
 ) -> StreamingResponse:
@@ -42,6 +50,28 @@ def send_feedback(
     )
 
 
+@stats_router.get("/")
+def get_stats() -> dict:
+
+    return {
+        "embedding_cache": embedding_cache.stats(),
+        "embedding_store": embedding_store.stats() if embedding_store else None,
+        "embedding_batcher": embedding_batcher.stats() if embedding_batcher else None,
+        "retrieval_cache": retrieval_cache.stats(),
+        "product_cache": product_cache.stats(),
+        "product_catalog": product_catalog.stats(),
+        "prompts": prompt_registry.stats(),
+        "langsmith_prompts": remote_prompt_cache.stats(),
+        "llm_clients": llm_clients.stats(),
+        "llm_models": model_stats.stats(),
+        "single_flight": {
+            "embeddings": embedding_flight.stats(),
+            "hybrid_query": hybrid_query_flight.stats()
+        }
+    }
+
+
 api_router = APIRouter()
 api_router.include_router(rag_router, prefix="/agent", tags=["agent"])
-api_router.include_router(feedback_router, prefix="/submit_feedback", tags=["feedback"])
\ No newline at end of file
+api_router.include_router(feedback_router, prefix="/submit_feedback", tags=["feedback"])
+api_router.include_router(stats_router, prefix="/stats", tags=["stats"])
\ No newline at end of file
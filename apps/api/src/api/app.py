@@ -1,8 +1,17 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from api.api.middleware import RequestIDMiddleware
 from fastapi.middleware.cors import CORSMiddleware
 
 from api.api.endpoints import api_router
+from shared.embeddings import embedding_store, warm_embedding_cache
+from shared.embedding_store import schedule_compaction
+from shared.qdrant import get_qdrant_client, close_qdrant_client, close_async_qdrant_client
+from api.agents.utils.payload_indexes import check_payload_indexes
+from api.agents.utils.catalog import load_product_catalog, schedule_catalog_refresh
+from api.agents.utils.prompt_management import prompt_registry
+from api.agents.utils.llm_clients import llm_clients
+from api.core.config import config
 
 import logging
 
@@ -14,7 +23,41 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+
+    stop_compaction = None
+    stop_catalog_refresh = None
+
+    if config.PAYLOAD_INDEX_CHECK_ENABLED:
+        check_payload_indexes(get_qdrant_client())
+
+    loaded = prompt_registry.load_all()
+    logger.info(f"Compiled {loaded} prompt files")
+
+    if embedding_store is not None:
+        warmed = warm_embedding_cache()
+        logger.info(f"Warmed embedding cache with {warmed} persisted embeddings")
+        stop_compaction = schedule_compaction(embedding_store, config.EMBEDDING_STORE_COMPACT_INTERVAL_SECONDS)
+
+    if config.PRODUCT_CATALOG_ENABLED:
+        load_product_catalog()
+        stop_catalog_refresh = schedule_catalog_refresh(config.PRODUCT_CATALOG_REFRESH_INTERVAL_SECONDS)
+
+    yield
+
+    if stop_compaction is not None:
+        stop_compaction.set()
+
+    if stop_catalog_refresh is not None:
+        stop_catalog_refresh.set()
+
+    close_qdrant_client()
+    llm_clients.close()
+    await close_async_qdrant_client()
+
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(RequestIDMiddleware)
 
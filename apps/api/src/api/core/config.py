@@ -1,10 +1,41 @@
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic_settings import SettingsConfigDict
 
-class Config(BaseSettings):
+from shared.core.config import SharedConfig
+
+class Config(SharedConfig):
     OPENAI_API_KEY: str
     GROQ_API_KEY: str
     GOOGLE_API_KEY: str
 
+    AGENT_LATENCY_BUDGET_SECONDS: float = 30
+
+    PAYLOAD_INDEX_CHECK_ENABLED: bool = True
+
+    LLM_HTTP2: bool = True
+    LLM_POOL_SIZE: int = 20
+    LLM_KEEPALIVE_EXPIRY_SECONDS: float = 60
+    LLM_TIMEOUT_SECONDS: float = 60
+    LLM_LATENCY_WINDOW: int = 200
+    LLM_HEDGING_ENABLED: bool = False
+    LLM_HEDGE_PERCENTILE: float = 95
+    LLM_HEDGE_DEFAULT_DELAY_SECONDS: float = 4
+    LLM_HEDGE_MIN_DELAY_SECONDS: float = 0.5
+    LLM_HEDGE_MIN_SAMPLES: int = 20
+
+    PROMPT_RELOAD_CHECK_SECONDS: float = 1.0
+    PROMPT_RENDER_CACHE_MAX_SIZE: int = 256
+    PROMPT_REGISTRY_TTL_SECONDS: float = 300
+    PROMPT_REGISTRY_CACHE_PATH: str = ""
+    # LangSmith prompt name -> commit hash, e.g. {"product-qa-agent": "1a2b3c4d"}
+    PROMPT_REGISTRY_PINS: dict[str, str] = {}
+
+    PRODUCT_CACHE_MAX_SIZE: int = 10000
+    PRODUCT_CACHE_TTL_SECONDS: float = 600
+
+    PRODUCT_CATALOG_ENABLED: bool = True
+    PRODUCT_CATALOG_SNAPSHOT_PATH: str = ""
+    PRODUCT_CATALOG_REFRESH_INTERVAL_SECONDS: float = 300
+
     model_config = SettingsConfigDict(env_file=".env")
 
 config = Config()
\ No newline at end of file
@@ -1,10 +1,17 @@
 from fastmcp import FastMCP
-from items_mcp_server.utils import retrieve_items_data, process_items_context
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from shared.retrieval import aretrieve_items_data, process_items_context, hybrid_query_flight
+from shared.embedding_providers import items_embedding_provider
+from shared.embeddings import embedding_cache, embedding_store, embedding_batcher, embedding_flight, warm_embedding_cache
+from shared.embedding_store import schedule_compaction
+from shared.retrieval_cache import retrieval_cache
+from items_mcp_server.core.config import config
 
 mcp = FastMCP("items_mcp_server")
 
 @mcp.tool()
-def get_formatted_items_context(query: str, top_k: int = 5) -> str:
+async def get_formatted_items_context(query: str, top_k: int = 5) -> str:
 
     """Get the top k context, each representing an inventory item for a given query.
     
@@ -16,11 +23,35 @@ def get_formatted_items_context(query: str, top_k: int = 5) -> str:
         A string of the top k context chunks with IDs and average ratings prepending each chunk, each representing an inventory item for a given query.
     """
 
-    context = retrieve_items_data(query, top_k)
+    context = await aretrieve_items_data(query, top_k)
     formatted_context = process_items_context(context)
 
     return formatted_context
 
 
+@mcp.custom_route("/stats", methods=["GET"])
+async def get_stats(request: Request) -> JSONResponse:
+
+    return JSONResponse({
+        "embedding_provider": repr(items_embedding_provider()),
+        "embedding_cache": embedding_cache.stats(),
+        "embedding_store": embedding_store.stats() if embedding_store else None,
+        "embedding_batcher": embedding_batcher.stats() if embedding_batcher else None,
+        "retrieval_cache": retrieval_cache.stats(),
+        "single_flight": {
+            "embeddings": embedding_flight.stats(),
+            "hybrid_query": hybrid_query_flight.stats()
+        }
+    })
+
+
 if __name__ == "__main__":
+    # Same provider registry as the api: ITEMS_EMBEDDING_MODEL may name an OpenAI or a
+    # fastembed model, resolved here so a model the image cannot serve fails at startup
+    items_embedding_provider()
+
+    if embedding_store is not None:
+        warm_embedding_cache()
+        schedule_compaction(embedding_store, config.EMBEDDING_STORE_COMPACT_INTERVAL_SECONDS)
+
     mcp.run(transport="http", host="0.0.0.0", port=8000)
\ No newline at end of file
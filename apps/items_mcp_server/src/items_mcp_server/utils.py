@@ -1,68 +0,0 @@
-import openai
-from qdrant_client import QdrantClient
-from qdrant_client.models import Prefetch, FusionQuery, Document
-
-
-def get_embedding(text, model="text-embedding-3-small"):
-    response = openai.embeddings.create(
-        input=text,
-        model=model,
-    )
-
-    return response.data[0].embedding
-
-
-def retrieve_items_data(query, k=5):
-
-    query_embedding = get_embedding(query)
-
-    qdrant_client = QdrantClient(url="http://qdrant:6333")
-
-    results = qdrant_client.query_points(
-        collection_name="Amazon-items-collection-01-hybrid-search",
-        prefetch=[
-            Prefetch(
-                query=query_embedding,
-                using="text-embedding-3-small",
-                limit=20
-            ),
-            Prefetch(
-                query=Document(
-                    text=query,
-                    model="qdrant/bm25"
-                ),
-                using="bm25",
-                limit=20
-            )
-        ],
-        query=FusionQuery(fusion="rrf"),
-        limit=k,
-    )
-
-    retrieved_context_ids = []
-    retrieved_context = []
-    similarity_scores = []
-    retrieved_context_ratings = []
-
-    for result in results.points:
-        retrieved_context_ids.append(result.payload["parent_asin"])
-        retrieved_context.append(result.payload["description"])
-        retrieved_context_ratings.append(result.payload["average_rating"])
-        similarity_scores.append(result.score)
-
-    return {
-        "retrieved_context_ids": retrieved_context_ids,
-        "retrieved_context": retrieved_context,
-        "retrieved_context_ratings": retrieved_context_ratings,
-        "similarity_scores": similarity_scores,
-    }
-
-
-def process_items_context(context):
-
-    formatted_context = ""
-
-    for id, chunk, rating in zip(context["retrieved_context_ids"], context["retrieved_context"], context["retrieved_context_ratings"]):
-        formatted_context += f"- ID: {id}, rating: {rating}, description: {chunk}\n"
-
-    return formatted_context
\ No newline at end of file
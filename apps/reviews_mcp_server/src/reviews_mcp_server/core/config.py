@@ -1,6 +1,8 @@
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic_settings import SettingsConfigDict
 
-class Config(BaseSettings):
+from shared.core.config import SharedConfig
+
+class Config(SharedConfig):
     OPENAI_API_KEY: str
 
     model_config = SettingsConfigDict(env_file=".env")
@@ -1,10 +1,16 @@
 from fastmcp import FastMCP
-from reviews_mcp_server.utils import retrieve_reviews_data, process_reviews_context
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from shared.retrieval import aretrieve_reviews_data, process_reviews_context
+from shared.embeddings import embedding_cache, embedding_store, embedding_batcher, embedding_flight, warm_embedding_cache
+from shared.embedding_store import schedule_compaction
+from shared.retrieval_cache import retrieval_cache
+from reviews_mcp_server.core.config import config
 
 mcp = FastMCP("reviews_mcp_server")
 
 @mcp.tool()
-def get_formatted_reviews_context(query: str, item_list: list, top_k: int = 15) -> str:
+async def get_formatted_reviews_context(query: str, item_list: list, top_k: int = 15) -> str:
 
     """Get the top k reviews matching a query for a list of prefiltered items.
     
@@ -17,11 +23,29 @@ def get_formatted_reviews_context(query: str, item_list: list, top_k: int = 15)
         A string of the top k context chunks with IDs prepending each chunk, each representing a review for a given inventory item for a given query.
     """
 
-    context = retrieve_reviews_data(query, item_list, top_k)
+    context = await aretrieve_reviews_data(query, item_list, top_k)
     formatted_context = process_reviews_context(context)
 
     return formatted_context
 
 
+@mcp.custom_route("/stats", methods=["GET"])
+async def get_stats(request: Request) -> JSONResponse:
+
+    return JSONResponse({
+        "embedding_cache": embedding_cache.stats(),
+        "embedding_store": embedding_store.stats() if embedding_store else None,
+        "embedding_batcher": embedding_batcher.stats() if embedding_batcher else None,
+        "retrieval_cache": retrieval_cache.stats(),
+        "single_flight": {
+            "embeddings": embedding_flight.stats()
+        }
+    })
+
+
 if __name__ == "__main__":
+    if embedding_store is not None:
+        warm_embedding_cache()
+        schedule_compaction(embedding_store, config.EMBEDDING_STORE_COMPACT_INTERVAL_SECONDS)
+
     mcp.run(transport="http", host="0.0.0.0", port=8000)
\ No newline at end of file
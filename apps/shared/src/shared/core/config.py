@@ -0,0 +1,46 @@
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+class SharedConfig(BaseSettings):
+    """Settings read by the shared retrieval modules, the apps' configs extend it."""
+
+    ITEMS_COLLECTION: str = "Amazon-items-collection-01-hybrid-search"
+    REVIEWS_COLLECTION: str = "Amazon-items-collection-01-reviews"
+    REVIEWS_GROUPED: bool = True
+    REVIEWS_MAX_PER_ITEM: int = 5
+    ITEMS_QUERY_FILTERS_ENABLED: bool = True
+
+    SEARCH_PROFILE: str = "balanced"
+
+    ITEMS_EMBEDDING_MODEL: str = "text-embedding-3-small"
+    ITEMS_EMBEDDING_DIMENSIONS: int | None = None
+    FASTEMBED_THREADS: int | None = None
+    ITEMS_STORAGE_PROFILE: str = "float32"
+    REVIEWS_STORAGE_PROFILE: str = "float32"
+
+    QDRANT_URL: str = "http://qdrant:6333"
+    QDRANT_GRPC_PORT: int = 6334
+    QDRANT_PREFER_GRPC: bool = False
+    QDRANT_TIMEOUT_SECONDS: int = 10
+    QDRANT_POOL_SIZE: int = 32
+    QDRANT_KEEPALIVE_EXPIRY_SECONDS: float = 30
+    QDRANT_HNSW_EF: int | None = None
+
+    RETRIEVAL_CACHE_MAX_SIZE: int = 2048
+    RETRIEVAL_CACHE_VERSION_CHECK_SECONDS: float = 10
+
+    EMBEDDING_CACHE_MAX_SIZE: int = 10000
+    EMBEDDING_CACHE_TTL_SECONDS: float = 3600
+
+    EMBEDDING_STORE_PATH: str = ""
+    EMBEDDING_STORE_WARM_LIMIT: int = 10000
+    EMBEDDING_STORE_MAX_AGE_DAYS: float = 30
+    EMBEDDING_STORE_COMPACT_INTERVAL_SECONDS: float = 21600
+
+    EMBEDDING_BATCH_ENABLED: bool = True
+    EMBEDDING_BATCH_WINDOW_MS: float = 5
+    EMBEDDING_BATCH_MAX_SIZE: int = 64
+    EMBEDDING_BATCH_MAX_CONCURRENCY: int = 8
+
+    model_config = SettingsConfigDict(env_file=".env", extra="ignore")
+
+config = SharedConfig()
@@ -0,0 +1,155 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+logger = logging.getLogger(__name__)
+
+
+#### MICRO-BATCHING EMBEDDING DISPATCHER ####
+
+class _PendingEmbedding:
+
+    __slots__ = ("model", "text", "future", "enqueued_at")
+
+    def __init__(self, model, text: str):
+        self.model = model
+        self.text = text
+        self.future = Future()
+        self.enqueued_at = time.monotonic()
+
+
+class EmbeddingBatcher:
+    """Coalesce concurrent single-text embedding calls into batched API requests.
+
+    Callers block on embed() while a collector thread gathers everything that
+    arrives within window_ms of the first pending call (up to max_batch_size),
+    then hands the batch to a small pool that sends one request per model.
+
+    Calls are grouped by model, which can be any hashable (a model name or a
+    provider object). embed_fn(model, texts) must return (embeddings, usage)
+    with embeddings in the same order as texts.
+    """
+
+    def __init__(self, embed_fn, window_ms: float = 5, max_batch_size: int = 64, max_concurrent_batches: int = 8):
+        self.embed_fn = embed_fn
+        self.window_seconds = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.max_concurrent_batches = max_concurrent_batches
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._pid = None
+        self._executor = None
+
+        self._batches = 0
+        self._requests = 0
+        self._max_batch_size_seen = 0
+        self._queue_wait_total = 0.0
+        self._queue_wait_max = 0.0
+
+    def _ensure_started(self):
+        # Started lazily and per process, since threads do not survive a fork of uvicorn workers
+        if self._pid == os.getpid():
+            return
+
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+
+            self._queue = queue.Queue()
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrent_batches,
+                thread_name_prefix="embedding-batch"
+            )
+            threading.Thread(target=self._collect, name="embedding-batcher", daemon=True).start()
+            self._pid = os.getpid()
+
+    def submit(self, model, text: str) -> Future:
+        self._ensure_started()
+
+        pending = _PendingEmbedding(model, text)
+        self._queue.put(pending)
+
+        return pending.future
+
+    def embed(self, model, text: str, timeout: float = None):
+        """Return (embedding, batch_info) for a single text."""
+        return self.submit(model, text).result(timeout=timeout)
+
+    def _collect(self):
+        while True:
+            first = self._queue.get()
+            batch = [first]
+            deadline = first.enqueued_at + self.window_seconds
+
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._executor.submit(self._dispatch, batch)
+
+    def _dispatch(self, batch: list[_PendingEmbedding]):
+        started_at = time.monotonic()
+
+        by_model = {}
+        for pending in batch:
+            by_model.setdefault(pending.model, []).append(pending)
+
+        for model, pendings in by_model.items():
+            # Identical texts in the same window are only sent once
+            texts = list(dict.fromkeys(pending.text for pending in pendings))
+
+            try:
+                embeddings, usage = self.embed_fn(model, texts)
+            except Exception as e:
+                logger.warning(f"Embedding batch of {len(texts)} texts for {model} failed: {e}")
+                for pending in pendings:
+                    pending.future.set_exception(e)
+                continue
+
+            embedding_by_text = dict(zip(texts, embeddings))
+
+            for pending in pendings:
+                pending.future.set_result((
+                    embedding_by_text[pending.text],
+                    {
+                        "batch_size": len(pendings),
+                        "unique_texts": len(texts),
+                        "queue_wait_ms": (started_at - pending.enqueued_at) * 1000,
+                        "batch_usage": usage,
+                    }
+                ))
+
+            self._record(pendings, started_at)
+
+    def _record(self, pendings: list[_PendingEmbedding], started_at: float):
+        waits = [started_at - pending.enqueued_at for pending in pendings]
+
+        with self._lock:
+            self._batches += 1
+            self._requests += len(pendings)
+            self._max_batch_size_seen = max(self._max_batch_size_seen, len(pendings))
+            self._queue_wait_total += sum(waits)
+            self._queue_wait_max = max(self._queue_wait_max, max(waits))
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "window_ms": self.window_seconds * 1000,
+                "max_batch_size": self.max_batch_size,
+                "batches": self._batches,
+                "requests": self._requests,
+                "avg_batch_size": self._requests / self._batches if self._batches else 0.0,
+                "max_batch_size_seen": self._max_batch_size_seen,
+                "avg_queue_wait_ms": self._queue_wait_total / self._requests * 1000 if self._requests else 0.0,
+                "max_queue_wait_ms": self._queue_wait_max * 1000,
+            }
@@ -0,0 +1,169 @@
+import asyncio
+import threading
+
+import openai
+from qdrant_client.models import VectorParams, Distance
+
+from shared.core.config import config
+
+
+#### EMBEDDING PROVIDERS ####
+
+OPENAI_EMBEDDING_MODELS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536,
+}
+
+
+class EmbeddingProvider:
+    """Turns texts into dense vectors for one model and describes the matching Qdrant vector."""
+
+    name = ""
+
+    def __init__(self, model: str):
+        self.model = model
+
+    @property
+    def key(self) -> str:
+        """Identifies the vector space, used to key cached and persisted embeddings."""
+        return self.model
+
+    @property
+    def vector_name(self) -> str:
+        """Name of the dense vector this model is stored under in Qdrant collections."""
+        return self.model.split("/")[-1]
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.key})"
+
+    @property
+    def dimensions(self) -> int:
+        raise NotImplementedError
+
+    def vector_params(self) -> VectorParams:
+        return VectorParams(size=self.dimensions, distance=Distance.COSINE)
+
+    def embed_queries(self, texts: list[str]) -> tuple[list[list[float]], dict]:
+        """Embed search queries, returning (embeddings, usage)."""
+        raise NotImplementedError
+
+    async def aembed_queries(self, texts: list[str]) -> tuple[list[list[float]], dict]:
+        """Async embed_queries, runs the blocking call in a worker thread unless a provider has a native client."""
+        return await asyncio.to_thread(self.embed_queries, texts)
+
+    def embed_documents(self, texts: list[str]) -> tuple[list[list[float]], dict]:
+        """Embed texts for indexing, returning (embeddings, usage)."""
+        return self.embed_queries(texts)
+
+
+class OpenAIEmbeddingProvider(EmbeddingProvider):
+    """Hosted OpenAI embeddings, optionally shortened through the API's dimensions parameter."""
+
+    name = "openai"
+
+    def __init__(self, model: str, dimensions: int = None):
+        super().__init__(model)
+
+        if dimensions == OPENAI_EMBEDDING_MODELS[model]:
+            dimensions = None
+
+        if dimensions is not None and model == "text-embedding-ada-002":
+            raise ValueError(f"{model} does not support reduced dimensions")
+
+        self.reduced_dimensions = dimensions
+        self._async_client = None
+
+    @property
+    def key(self) -> str:
+        if self.reduced_dimensions:
+            return f"{self.model}-{self.reduced_dimensions}"
+        return self.model
+
+    @property
+    def vector_name(self) -> str:
+        # Full-size vectors keep the bare model name used by the existing collections
+        return self.key
+
+    @property
+    def dimensions(self) -> int:
+        return self.reduced_dimensions or OPENAI_EMBEDDING_MODELS[self.model]
+
+    def _request(self, texts):
+        kwargs = {"dimensions": self.reduced_dimensions} if self.reduced_dimensions else {}
+        return dict(input=texts, model=self.model, **kwargs)
+
+    @staticmethod
+    def _parse(response):
+        embeddings = [data.embedding for data in sorted(response.data, key=lambda data: data.index)]
+
+        return embeddings, {
+            "input_tokens": response.usage.prompt_tokens,
+            "total_tokens": response.usage.total_tokens,
+        }
+
+    def embed_queries(self, texts):
+        return self._parse(openai.embeddings.create(**self._request(texts)))
+
+    async def aembed_queries(self, texts):
+        if self._async_client is None:
+            self._async_client = openai.AsyncOpenAI()
+
+        return self._parse(await self._async_client.embeddings.create(**self._request(texts)))
+
+
+class FastEmbedProvider(EmbeddingProvider):
+    """Local ONNX embedding model run on CPU through fastembed, with no network hop."""
+
+    name = "fastembed"
+
+    def __init__(self, model: str, threads: int = None):
+        super().__init__(model)
+
+        try:
+            from fastembed import TextEmbedding
+        except ImportError as e:
+            raise ImportError(
+                f"Embedding model {model} needs the fastembed package, install the shared[local] extra to use local embeddings"
+            ) from e
+
+        self._model = TextEmbedding(model_name=model, threads=threads)
+
+    @property
+    def dimensions(self) -> int:
+        return self._model.embedding_size
+
+    def embed_queries(self, texts):
+        return [embedding.tolist() for embedding in self._model.query_embed(texts)], {}
+
+    def embed_documents(self, texts):
+        return [embedding.tolist() for embedding in self._model.embed(texts)], {}
+
+
+_providers = {}
+_providers_lock = threading.Lock()
+
+
+def get_embedding_provider(model: str, dimensions: int = None) -> EmbeddingProvider:
+    """Return the shared provider for a model: OpenAI for its hosted models, fastembed for anything else."""
+    provider = _providers.get((model, dimensions))
+
+    if provider is None:
+        with _providers_lock:
+            provider = _providers.get((model, dimensions))
+
+            if provider is None:
+                if model in OPENAI_EMBEDDING_MODELS:
+                    provider = OpenAIEmbeddingProvider(model, dimensions=dimensions)
+                elif dimensions is not None:
+                    raise ValueError(f"Reduced dimensions are only supported for OpenAI embedding models, not {model}")
+                else:
+                    provider = FastEmbedProvider(model, threads=config.FASTEMBED_THREADS)
+                _providers[(model, dimensions)] = provider
+
+    return provider
+
+
+def items_embedding_provider() -> EmbeddingProvider:
+    """Provider for the dense vectors of the configured items collection."""
+    return get_embedding_provider(config.ITEMS_EMBEDDING_MODEL, config.ITEMS_EMBEDDING_DIMENSIONS)
@@ -0,0 +1,195 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+
+#### PERSISTENT EMBEDDING STORE ####
+
+class EmbeddingStore:
+    """SQLite-backed store of query embeddings kept as raw float32 blobs.
+
+    The database runs in WAL mode so every uvicorn worker (and the MCP
+    servers, when they share the volume) can read it concurrently while
+    writes are serialised by SQLite. Vectors are returned as read-only
+    numpy views over the stored blob, so a lookup never decodes or copies
+    the vector itself.
+
+    Reads do not write: touch() only records the time of a hit in memory,
+    and the recorded times are written in one transaction once
+    touch_flush_size of them are pending, and before every compaction.
+    """
+
+    def __init__(self, path: str, max_age_days: float = 30, touch_flush_size: int = 256):
+        self.path = path
+        self.max_age_days = max_age_days
+        self.touch_flush_size = touch_flush_size
+        self._local = threading.local()
+        self._touched = {}
+        self._touched_lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    model TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    dimensions INTEGER NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_used_at REAL NOT NULL,
+                    PRIMARY KEY (model, text)
+                ) WITHOUT ROWID
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS embeddings_last_used_at ON embeddings (last_used_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+
+        return conn
+
+    def get(self, model: str, text: str):
+        try:
+            row = self._connect().execute(
+                "SELECT vector FROM embeddings WHERE model = ? AND text = ?",
+                (model, text)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding store read failed: {e}")
+            return None
+
+        if row is None:
+            return None
+
+        return np.frombuffer(row[0], dtype=np.float32)
+
+    def put(self, model: str, text: str, embedding):
+        vector = np.asarray(embedding, dtype=np.float32)
+
+        try:
+            self._connect().execute(
+                """
+                INSERT INTO embeddings (model, text, dimensions, vector, last_used_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (model, text) DO UPDATE SET last_used_at = excluded.last_used_at
+                """,
+                (model, text, vector.shape[0], vector.tobytes(), time.time())
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Embedding store write failed: {e}")
+
+    def iter_recent(self, limit: int):
+        """Yield (model, text, vector) for the most recently used embeddings."""
+        rows = self._connect().execute(
+            "SELECT model, text, vector FROM embeddings ORDER BY last_used_at DESC LIMIT ?",
+            (limit,)
+        )
+
+        for model, text, blob in rows:
+            yield model, text, np.frombuffer(blob, dtype=np.float32)
+
+    def touch(self, model: str, text: str):
+        """Record that an embedding was used, written later by flush_touches()."""
+        with self._touched_lock:
+            self._touched[(model, text)] = time.time()
+            pending = len(self._touched)
+
+        if pending >= self.touch_flush_size:
+            self.flush_touches()
+
+    def flush_touches(self) -> int:
+        """Write the pending last_used_at updates in one transaction, returning how many were written."""
+        with self._touched_lock:
+            touched, self._touched = self._touched, {}
+
+        if not touched:
+            return 0
+
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN")
+            conn.executemany(
+                "UPDATE embeddings SET last_used_at = MAX(last_used_at, ?) WHERE model = ? AND text = ?",
+                [(used_at, model, text) for (model, text), used_at in touched.items()]
+            )
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            logger.warning(f"Embedding store write failed: {e}")
+            return 0
+
+        return len(touched)
+
+    def compact(self) -> int:
+        """Drop embeddings unused for max_age_days and reclaim the freed pages."""
+        # Recency recorded since the last flush must land first, or recently used rows look stale
+        self.flush_touches()
+
+        conn = self._connect()
+        cutoff = time.time() - self.max_age_days * 86400
+
+        deleted = conn.execute("DELETE FROM embeddings WHERE last_used_at < ?", (cutoff,)).rowcount
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        if deleted:
+            conn.execute("VACUUM")
+
+        return deleted
+
+    def stats(self) -> dict:
+        count = self._connect().execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+        return {
+            "path": self.path,
+            "size": count,
+            "file_bytes": os.path.getsize(self.path) if os.path.exists(self.path) else 0,
+            "max_age_days": self.max_age_days,
+            "pending_touches": len(self._touched),
+        }
+
+
+def open_embedding_store(path: str, max_age_days: float):
+    """Open the store at path, or return None when persistence is disabled or unavailable."""
+    if not path:
+        return None
+
+    try:
+        return EmbeddingStore(path, max_age_days=max_age_days)
+    except (sqlite3.Error, OSError) as e:
+        logger.warning(f"Embedding store disabled, could not open {path}: {e}")
+        return None
+
+
+def schedule_compaction(store: EmbeddingStore, interval_seconds: float) -> threading.Event:
+    """Run store.compact() every interval_seconds on a daemon thread; set the returned event to stop."""
+    stop = threading.Event()
+
+    def _run():
+        while not stop.wait(interval_seconds):
+            try:
+                deleted = store.compact()
+                logger.info(f"Embedding store compacted, removed {deleted} stale embeddings")
+            except sqlite3.Error as e:
+                logger.warning(f"Embedding store compaction failed: {e}")
+
+        store.flush_touches()
+
+    threading.Thread(target=_run, name="embedding-store-compaction", daemon=True).start()
+
+    return stop
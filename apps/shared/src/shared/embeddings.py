@@ -0,0 +1,283 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+from langsmith import traceable, get_current_run_tree
+
+from shared.core.config import config
+from shared.embedding_store import open_embedding_store
+from shared.embedding_batcher import EmbeddingBatcher
+from shared.single_flight import SingleFlight
+from shared.embedding_providers import EmbeddingProvider, get_embedding_provider
+
+
+#### EMBEDDING CACHE ####
+
+class EmbeddingCache:
+    """Thread-safe LRU cache of query embeddings with TTL eviction."""
+
+    def __init__(self, max_size: int = 10000, ttl_seconds: float = 3600):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(text.split())
+
+    def get(self, model: str, text: str):
+        key = (model, self.normalize(text))
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            embedding, expires_at = entry
+            if self.ttl_seconds > 0 and expires_at < time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return embedding
+
+    def set(self, model: str, text: str, embedding: list[float]):
+        if self.max_size <= 0:
+            return
+
+        key = (model, self.normalize(text))
+
+        with self._lock:
+            self._entries[key] = (embedding, time.monotonic() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+            }
+
+
+embedding_cache = EmbeddingCache(
+    max_size=config.EMBEDDING_CACHE_MAX_SIZE,
+    ttl_seconds=config.EMBEDDING_CACHE_TTL_SECONDS,
+)
+
+embedding_store = open_embedding_store(
+    config.EMBEDDING_STORE_PATH,
+    max_age_days=config.EMBEDDING_STORE_MAX_AGE_DAYS,
+)
+
+
+def warm_embedding_cache(limit: int = None) -> int:
+    """Load the most recently used persisted embeddings into the in-memory cache."""
+    if embedding_store is None:
+        return 0
+
+    if limit is None:
+        limit = min(config.EMBEDDING_STORE_WARM_LIMIT, embedding_cache.max_size)
+
+    # Oldest first, so the most recently used embeddings end up at the MRU end of the cache
+    recent = list(embedding_store.iter_recent(limit))
+    for model, text, vector in reversed(recent):
+        embedding_cache.set(model, text, vector)
+
+    return len(recent)
+
+
+#### QUERY EMBEDDING ####
+
+def create_embeddings(provider: EmbeddingProvider, texts: list[str]):
+    """Embed a list of query texts in one provider call, returning (embeddings, usage)."""
+    return provider.embed_queries(texts)
+
+
+embedding_batcher = EmbeddingBatcher(
+    create_embeddings,
+    window_ms=config.EMBEDDING_BATCH_WINDOW_MS,
+    max_batch_size=config.EMBEDDING_BATCH_MAX_SIZE,
+    max_concurrent_batches=config.EMBEDDING_BATCH_MAX_CONCURRENCY,
+) if config.EMBEDDING_BATCH_ENABLED else None
+
+
+def _from_store(provider: EmbeddingProvider, normalized_text: str):
+    if embedding_store is None:
+        return None
+
+    stored = embedding_store.get(provider.key, normalized_text)
+
+    if stored is None:
+        return None
+
+    # The read-only float32 view is cached and returned as is, Qdrant's client takes
+    # numpy vectors, so a store hit never copies the vector into a Python list
+    embedding_cache.set(provider.key, normalized_text, stored)
+    embedding_store.touch(provider.key, normalized_text)
+
+    return stored
+
+
+def _batched_info(provider: EmbeddingProvider, batch_info: dict) -> dict:
+    # The batch is billed as a whole, so each caller is attributed an even share of it
+    return {
+        "source": provider.name,
+        "usage": {
+            key: round(value / batch_info["unique_texts"])
+            for key, value in batch_info["batch_usage"].items()
+        },
+        "batch": {
+            "batch_size": batch_info["batch_size"],
+            "queue_wait_ms": batch_info["queue_wait_ms"],
+        },
+    }
+
+
+def _remember(provider: EmbeddingProvider, normalized_text: str, embedding: list[float]):
+    embedding_cache.set(provider.key, normalized_text, embedding)
+
+    if embedding_store is not None:
+        embedding_store.put(provider.key, normalized_text, embedding)
+
+
+def _fetch_embedding(provider: EmbeddingProvider, normalized_text: str) -> tuple[list[float], dict]:
+    """Resolve a cache miss from the persistent store or the provider and fill the caches."""
+    embedding = _from_store(provider, normalized_text)
+
+    if embedding is not None:
+        return embedding, {"source": "store"}
+
+    if embedding_batcher is not None:
+        embedding, batch_info = embedding_batcher.embed(provider, normalized_text)
+        info = _batched_info(provider, batch_info)
+    else:
+        [embedding], usage = create_embeddings(provider, [normalized_text])
+        info = {"source": provider.name, "usage": usage}
+
+    _remember(provider, normalized_text, embedding)
+
+    return embedding, info
+
+
+async def _afetch_embedding(provider: EmbeddingProvider, normalized_text: str) -> tuple[list[float], dict]:
+    """Async _fetch_embedding, awaiting the batcher's future or the provider's async client."""
+    embedding = _from_store(provider, normalized_text)
+
+    if embedding is not None:
+        return embedding, {"source": "store"}
+
+    if embedding_batcher is not None:
+        embedding, batch_info = await asyncio.wrap_future(embedding_batcher.submit(provider, normalized_text))
+        info = _batched_info(provider, batch_info)
+    else:
+        [embedding], usage = await provider.aembed_queries([normalized_text])
+        info = {"source": provider.name, "usage": usage}
+
+    _remember(provider, normalized_text, embedding)
+
+    return embedding, info
+
+
+embedding_flight = SingleFlight("embeddings")
+
+
+def _annotate_run(current_run, provider: EmbeddingProvider, model: str):
+    if current_run:
+        current_run.metadata["ls_provider"] = provider.name
+        current_run.metadata["ls_model_name"] = model
+        current_run.metadata["embedding_dimensions"] = provider.dimensions
+
+
+def _annotate_source(current_run, info: dict, shared: bool):
+    if current_run:
+        if shared:
+            current_run.metadata["embedding_source"] = "in_flight"
+        else:
+            current_run.metadata["embedding_source"] = info["source"]
+            if info.get("usage"):
+                current_run.metadata["usage_metadata"] = info["usage"]
+            if "batch" in info:
+                current_run.metadata["embedding_batch"] = info["batch"]
+
+
+@traceable(
+    name="embed_query",
+    run_type="embedding",
+    metadata={"ls_provider": "openai", "ls_model_name": "text-embedding-3-small"}
+)
+def get_embedding(text, model="text-embedding-3-small", dimensions=None):
+
+    provider = get_embedding_provider(model, dimensions)
+
+    current_run = get_current_run_tree()
+    _annotate_run(current_run, provider, model)
+
+    embedding = embedding_cache.get(provider.key, text)
+
+    if embedding is not None:
+        _annotate_source(current_run, {"source": "memory"}, shared=False)
+        return embedding
+
+    normalized_text = EmbeddingCache.normalize(text)
+
+    (embedding, info), shared = embedding_flight.do(
+        (provider.key, normalized_text),
+        lambda: _fetch_embedding(provider, normalized_text)
+    )
+
+    _annotate_source(current_run, info, shared)
+
+    return embedding
+
+
+@traceable(
+    name="embed_query",
+    run_type="embedding",
+    metadata={"ls_provider": "openai", "ls_model_name": "text-embedding-3-small"}
+)
+async def aget_embedding(text, model="text-embedding-3-small", dimensions=None):
+
+    provider = get_embedding_provider(model, dimensions)
+
+    current_run = get_current_run_tree()
+    _annotate_run(current_run, provider, model)
+
+    embedding = embedding_cache.get(provider.key, text)
+
+    if embedding is not None:
+        _annotate_source(current_run, {"source": "memory"}, shared=False)
+        return embedding
+
+    normalized_text = EmbeddingCache.normalize(text)
+
+    (embedding, info), shared = await embedding_flight.ado(
+        (provider.key, normalized_text),
+        lambda: _afetch_embedding(provider, normalized_text)
+    )
+
+    _annotate_source(current_run, info, shared)
+
+    return embedding
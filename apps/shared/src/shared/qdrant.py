@@ -0,0 +1,120 @@
+import asyncio
+import os
+import threading
+import weakref
+
+import httpx
+from qdrant_client import QdrantClient, AsyncQdrantClient
+
+from shared.core.config import config
+
+
+#### SHARED QDRANT CLIENT ####
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+
+# Async connections belong to the event loop that opened them, so there is one client per loop
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _client_options(url: str = None, prefer_grpc: bool = None) -> dict:
+    url = url or config.QDRANT_URL
+    prefer_grpc = config.QDRANT_PREFER_GRPC if prefer_grpc is None else prefer_grpc
+
+    return dict(
+        url=url,
+        grpc_port=config.QDRANT_GRPC_PORT,
+        prefer_grpc=prefer_grpc,
+        timeout=config.QDRANT_TIMEOUT_SECONDS,
+        limits=httpx.Limits(
+            max_connections=config.QDRANT_POOL_SIZE,
+            max_keepalive_connections=config.QDRANT_POOL_SIZE,
+            keepalive_expiry=config.QDRANT_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        grpc_options={
+            "grpc.keepalive_time_ms": int(config.QDRANT_KEEPALIVE_EXPIRY_SECONDS * 1000),
+            "grpc.keepalive_permit_without_calls": 1,
+        },
+    )
+
+
+def create_qdrant_client(url: str = None, prefer_grpc: bool = None) -> QdrantClient:
+    """Build a QdrantClient from settings, with a keep-alive connection pool and timeouts."""
+    return QdrantClient(**_client_options(url, prefer_grpc))
+
+
+def create_async_qdrant_client(url: str = None, prefer_grpc: bool = None) -> AsyncQdrantClient:
+    return AsyncQdrantClient(**_client_options(url, prefer_grpc))
+
+
+def get_qdrant_client() -> QdrantClient:
+    """Return the process-wide Qdrant client, creating it on first use.
+
+    Sockets and gRPC channels do not survive a fork, so a forked worker
+    builds its own client instead of reusing the parent's.
+    """
+    global _client, _client_pid
+
+    if _client is not None and _client_pid == os.getpid():
+        return _client
+
+    with _client_lock:
+        if _client is None or _client_pid != os.getpid():
+            _client = create_qdrant_client()
+            _client_pid = os.getpid()
+
+        return _client
+
+
+def close_qdrant_client():
+    global _client, _client_pid
+
+    with _client_lock:
+        if _client is not None and _client_pid == os.getpid():
+            _client.close()
+
+        _client = None
+        _client_pid = None
+
+
+def get_async_qdrant_client() -> AsyncQdrantClient:
+    """Return the AsyncQdrantClient of the running event loop, creating it on first use."""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+
+    if client is None:
+        client = create_async_qdrant_client()
+        _async_clients[loop] = client
+
+    return client
+
+
+async def close_async_qdrant_client():
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+
+    if client is not None:
+        await client.close()
+
+
+def collection_version(qdrant_client: QdrantClient, collection: str) -> str:
+    """Version stamp of a collection or alias: the collection it resolves to, its
+    metadata "version" (if ingestion sets one) and its point count."""
+    aliases = {alias.alias_name: alias.collection_name for alias in qdrant_client.get_aliases().aliases}
+    name = aliases.get(collection, collection)
+
+    info = qdrant_client.get_collection(name)
+    version = (info.config.metadata or {}).get("version", "")
+
+    return f"{name}:{version}:{info.points_count}"
+
+
+async def acollection_version(qdrant_client: AsyncQdrantClient, collection: str) -> str:
+    aliases = {alias.alias_name: alias.collection_name for alias in (await qdrant_client.get_aliases()).aliases}
+    name = aliases.get(collection, collection)
+
+    info = await qdrant_client.get_collection(name)
+    version = (info.config.metadata or {}).get("version", "")
+
+    return f"{name}:{version}:{info.points_count}"
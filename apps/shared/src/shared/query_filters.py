@@ -0,0 +1,145 @@
+import re
+from dataclasses import dataclass
+
+from langsmith import traceable
+from qdrant_client.models import Filter, FieldCondition, Range, MatchText
+
+
+#### QUERY FILTER EXTRACTION ####
+
+# Amounts need a currency marker so "4 stars" or "2 pack" are never read as prices
+_AMOUNT = r"(?:\$\s?(\d+(?:\.\d+)?)|(\d+(?:\.\d+)?)\s?(?:dollars|usd|bucks))"
+
+_PRICE_BETWEEN = re.compile(rf"(?<!\w)(?:between\s+)?{_AMOUNT}\s*(?:-|to|and)\s*{_AMOUNT}", re.IGNORECASE)
+_PRICE_MAX = re.compile(rf"\b(?:under|below|less than|cheaper than|at most|max(?:imum)?|up to|no more than)\s+{_AMOUNT}", re.IGNORECASE)
+_PRICE_MIN = re.compile(rf"\b(?:over|above|more than|at least|min(?:imum)?|starting at)\s+{_AMOUNT}", re.IGNORECASE)
+
+# A rating is only a bound with an explicit cue: "at least 4 stars", "4+ stars", "4 stars and up" are
+# lower bounds, "under 3 stars", "3 stars or less" upper bounds, and a bare "4 stars" stays in the text
+_RATING = r"([1-5](?:\.\d)?)"
+_STARS = r"[- ]?stars?\b"
+_OR_MORE = r"(?:and up|or (?:more|higher|better|above))"
+_OR_LESS = r"(?:or (?:less|lower|fewer|below))"
+
+_RATING_MIN = re.compile(
+    rf"\b(?:at least|min(?:imum)?|over|above|more than)\s+{_RATING}\s*\+?\s*{_STARS}(?:\s+{_OR_MORE})?"
+    rf"|\b{_RATING}\s*(?:\+\s*{_STARS}|{_STARS}\s*(?:\+|{_OR_MORE}))",
+    re.IGNORECASE,
+)
+_RATING_MAX = re.compile(
+    rf"\b(?:under|below|less than|at most|max(?:imum)?|up to|no more than)\s+{_RATING}\s*{_STARS}(?:\s+{_OR_LESS})?"
+    rf"|\b{_RATING}\s*{_STARS}\s+{_OR_LESS}",
+    re.IGNORECASE,
+)
+
+# A brand needs an explicit cue, "made by Sony", "brand Anker" or "Amazon Basics brand", and a capitalized
+# name of up to three words. Bare "by"/"from" are not cues, "delivered by Friday" is not a brand
+_BRAND_NAME = r"([A-Z][\w&'-]*(?:\s+[A-Z][\w&'-]*){0,2})"
+_BRAND = re.compile(rf"\b(?i:made by|brand(?: name)?:?)\s+{_BRAND_NAME}|\b{_BRAND_NAME}\s+(?i:brand)\b")
+
+# Capitalized words next to a cue that describe the brand rather than name it, "Best brand", "Brand New"
+_BRAND_STOPWORDS = {
+    "a", "an", "the", "any", "some", "no", "my", "your", "our", "this", "that", "which", "what",
+    "best", "better", "good", "great", "top", "nice", "decent", "cheap", "cheapest", "budget", "premium",
+    "luxury", "designer", "quality", "popular", "famous", "known", "major", "reliable", "reputable",
+    "trusted", "favorite", "favourite", "same", "other", "different", "new", "name", "store", "generic", "off",
+}
+
+_CONNECTORS = re.compile(r"\b(?:with|and|that (?:is|are|costs?)|which (?:is|are|costs?)|priced|rated|for)\s*$", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class ParsedQuery:
+    text: str
+    price_min: float | None = None
+    price_max: float | None = None
+    min_rating: float | None = None
+    max_rating: float | None = None
+    brand: str | None = None
+
+    def filter(self) -> Filter | None:
+        """Qdrant payload filter for the extracted constraints, None when there are none."""
+        conditions = []
+
+        if self.price_min is not None or self.price_max is not None:
+            conditions.append(FieldCondition(key="price", range=Range(gte=self.price_min, lte=self.price_max)))
+
+        if self.min_rating is not None or self.max_rating is not None:
+            conditions.append(FieldCondition(key="average_rating", range=Range(gte=self.min_rating, lte=self.max_rating)))
+
+        if self.brand is not None:
+            conditions.append(FieldCondition(key="description", match=MatchText(text=self.brand)))
+
+        return Filter(must=conditions) if conditions else None
+
+
+def _amount(match, offset=0):
+    return float(match.group(1 + offset) or match.group(2 + offset))
+
+
+def _rating(match):
+    return float(match.group(1) or match.group(2))
+
+
+def _brand(text):
+    """First cued brand name in the text, cut at the first describing word next to the cue."""
+    for match in _BRAND.finditer(text):
+        # After the cue the name reads forwards, "brand Anker", before it backwards, "Top Sony brand"
+        words = match.group(1).split() if match.group(1) else match.group(2).split()[::-1]
+        name = []
+        for word in words:
+            if word.lower() in _BRAND_STOPWORDS:
+                break
+            name.append(word)
+        if name:
+            return " ".join(name if match.group(1) else name[::-1])
+
+    return None
+
+
+def _strip(text, match):
+    """Remove a matched constraint and any connector word left dangling before it."""
+    head = _CONNECTORS.sub("", text[:match.start()].rstrip())
+    return f"{head} {text[match.end():]}"
+
+
+@traceable(
+    name="parse_query_filters",
+    run_type="parser"
+)
+def parse_query_filters(query: str) -> ParsedQuery:
+    """Pull price ranges, rating bounds and brand mentions out of a product query.
+
+    The returned text is the query without the constraint phrases, so the
+    dense and BM25 prefetches search for the product itself.
+    """
+    text = query
+    constraints = {}
+
+    if match := _PRICE_BETWEEN.search(text):
+        low, high = _amount(match), _amount(match, 2)
+        constraints["price_min"], constraints["price_max"] = min(low, high), max(low, high)
+        text = _strip(text, match)
+    else:
+        if match := _PRICE_MAX.search(text):
+            constraints["price_max"] = _amount(match)
+            text = _strip(text, match)
+        if match := _PRICE_MIN.search(text):
+            constraints["price_min"] = _amount(match)
+            text = _strip(text, match)
+
+    if match := _RATING_MAX.search(text):
+        constraints["max_rating"] = _rating(match)
+        text = _strip(text, match)
+    if match := _RATING_MIN.search(text):
+        constraints["min_rating"] = _rating(match)
+        text = _strip(text, match)
+
+    # The brand stays in the text, it is a useful BM25 term
+    if brand := _brand(text):
+        constraints["brand"] = brand
+
+    text = " ".join(text.split()).strip(" ,.")
+
+    # Never leave the vector search without anything to look for
+    return ParsedQuery(text=text or query, **constraints)
@@ -0,0 +1,340 @@
+import math
+
+from langsmith import traceable
+from qdrant_client.models import Prefetch, FusionQuery, Document, Filter, FieldCondition, MatchAny
+
+from shared.embeddings import get_embedding, aget_embedding
+from shared.embedding_providers import items_embedding_provider
+from shared.single_flight import SingleFlight
+from shared.qdrant import get_qdrant_client, get_async_qdrant_client
+from shared.retrieval_cache import retrieval_cache
+from shared.query_filters import ParsedQuery, parse_query_filters
+from shared.search_profiles import resolve_search_profile
+from shared.storage_profiles import items_search_params, reviews_search_params
+from shared.core.config import config
+
+
+hybrid_query_flight = SingleFlight("hybrid_query")
+
+# Payloads are projected to the fields the context formatting reads, product
+# payloads also carry features, details and image lists
+ITEMS_PAYLOAD_FIELDS = ["parent_asin", "description", "average_rating"]
+
+REVIEWS_PAYLOAD_FIELDS = ["parent_asin", "text"]
+
+
+#### ITEMS RETRIEVAL ####
+
+def _parse_items_query(query):
+    if not config.ITEMS_QUERY_FILTERS_ENABLED:
+        return ParsedQuery(text=" ".join(query.split()))
+
+    return parse_query_filters(query)
+
+
+def _items_query(parsed, query_embedding, k, profile):
+    """query_points arguments for the items hybrid search, shared by the sync and async retrievers.
+
+    Price, rating and brand constraints extracted from the query filter both
+    prefetches, so fusion only ranks candidates that satisfy them.
+    """
+    query_filter = parsed.filter()
+
+    return dict(
+        collection_name=config.ITEMS_COLLECTION,
+        prefetch=[
+            Prefetch(
+                query=query_embedding,
+                using=items_embedding_provider().vector_name,
+                filter=query_filter,
+                params=items_search_params(hnsw_ef=profile.hnsw_ef, exact=profile.exact),
+                limit=profile.prefetch(k)
+            ),
+            Prefetch(
+                query=Document(
+                    text=parsed.text,
+                    model="qdrant/bm25"
+                ),
+                using="bm25",
+                filter=query_filter,
+                limit=profile.prefetch(k)
+            )
+        ],
+        query=FusionQuery(fusion="rrf"),
+        limit=k,
+        with_payload=ITEMS_PAYLOAD_FIELDS,
+        with_vectors=False,
+    )
+
+
+def _items_context(results):
+
+    retrieved_context_ids = []
+    retrieved_context = []
+    similarity_scores = []
+    retrieved_context_ratings = []
+
+    for result in results.points:
+        retrieved_context_ids.append(result.payload["parent_asin"])
+        retrieved_context.append(result.payload["description"])
+        retrieved_context_ratings.append(result.payload["average_rating"])
+        similarity_scores.append(result.score)
+
+    return {
+        "retrieved_context_ids": retrieved_context_ids,
+        "retrieved_context": retrieved_context,
+        "retrieved_context_ratings": retrieved_context_ratings,
+        "similarity_scores": similarity_scores,
+    }
+
+
+def _items_cache_key(query, k, profile):
+    # Results are reused until the collection's version stamp changes
+    return ("items", retrieval_cache.normalize(query), k, profile)
+
+
+@traceable(
+    name="retrieve_data",
+    run_type="retriever"
+)
+def retrieve_items_data(query, k=5, profile=None):
+    """Hybrid items search; profile is a search profile name, defaulting to the one chosen for the request."""
+    profile = resolve_search_profile(profile)
+
+    def _retrieve():
+        parsed = _parse_items_query(query)
+        query_embedding = get_embedding(parsed.text, model=config.ITEMS_EMBEDDING_MODEL, dimensions=config.ITEMS_EMBEDDING_DIMENSIONS)
+
+        qdrant_client = get_qdrant_client()
+
+        def _search(parsed):
+            # Identical concurrent queries share a single Qdrant round trip
+            results, _ = hybrid_query_flight.do(
+                (config.ITEMS_COLLECTION, parsed, k, profile),
+                lambda: qdrant_client.query_points(**_items_query(parsed, query_embedding, k, profile))
+            )
+            return results
+
+        results = _search(parsed)
+
+        # Constraints nothing satisfies fall back to the unfiltered search
+        if not results.points and parsed.filter() is not None:
+            results = _search(ParsedQuery(text=parsed.text))
+
+        return _items_context(results)
+
+    return retrieval_cache.fetch(config.ITEMS_COLLECTION, _items_cache_key(query, k, profile), _retrieve)
+
+
+@traceable(
+    name="retrieve_data",
+    run_type="retriever"
+)
+async def aretrieve_items_data(query, k=5, profile=None):
+    profile = resolve_search_profile(profile)
+
+    async def _retrieve():
+        parsed = _parse_items_query(query)
+        query_embedding = await aget_embedding(parsed.text, model=config.ITEMS_EMBEDDING_MODEL, dimensions=config.ITEMS_EMBEDDING_DIMENSIONS)
+
+        qdrant_client = get_async_qdrant_client()
+
+        async def _search(parsed):
+            results, _ = await hybrid_query_flight.ado(
+                (config.ITEMS_COLLECTION, parsed, k, profile),
+                lambda: qdrant_client.query_points(**_items_query(parsed, query_embedding, k, profile))
+            )
+            return results
+
+        results = await _search(parsed)
+
+        if not results.points and parsed.filter() is not None:
+            results = await _search(ParsedQuery(text=parsed.text))
+
+        return _items_context(results)
+
+    return await retrieval_cache.afetch(config.ITEMS_COLLECTION, _items_cache_key(query, k, profile), _retrieve)
+
+
+@traceable(
+    name="format_retrieved_context",
+    run_type="prompt"
+)
+def process_items_context(context):
+
+    formatted_context = ""
+
+    for id, chunk, rating in zip(context["retrieved_context_ids"], context["retrieved_context"], context["retrieved_context_ratings"]):
+        formatted_context += f"- ID: {id}, rating: {rating}, description: {chunk}\n"
+
+    return formatted_context
+
+
+#### REVIEWS RETRIEVAL ####
+
+def _reviews_filter(item_list):
+    return Filter(
+        must=[
+            FieldCondition(
+                key="parent_asin",
+                match=MatchAny(
+                    any=item_list
+                )
+            )
+        ]
+    )
+
+
+def _reviews_query(query_embedding, item_list, k, profile):
+    # A single dense source needs no fusion stage, the filter goes on the query itself
+    return dict(
+        collection_name=config.REVIEWS_COLLECTION,
+        query=query_embedding,
+        query_filter=_reviews_filter(item_list),
+        search_params=reviews_search_params(hnsw_ef=profile.hnsw_ef, exact=profile.exact),
+        limit=k,
+        with_payload=REVIEWS_PAYLOAD_FIELDS,
+        with_vectors=False,
+    )
+
+
+def reviews_per_item(item_list, k):
+    """Reviews to keep per item so the whole context stays around k.
+
+    The REVIEWS_MAX_PER_ITEM cap only shares the context out between several
+    items, a single item gets all k reviews asked for.
+    """
+    if len(item_list) <= 1:
+        return max(1, k)
+
+    return max(1, min(config.REVIEWS_MAX_PER_ITEM, math.ceil(k / len(item_list))))
+
+
+def _reviews_groups_query(query_embedding, item_list, k, profile):
+    return dict(
+        collection_name=config.REVIEWS_COLLECTION,
+        query=query_embedding,
+        query_filter=_reviews_filter(item_list),
+        search_params=reviews_search_params(hnsw_ef=profile.hnsw_ef, exact=profile.exact),
+        group_by="parent_asin",
+        group_size=reviews_per_item(item_list, k),
+        limit=len(item_list),
+        with_payload=REVIEWS_PAYLOAD_FIELDS,
+        with_vectors=False,
+    )
+
+
+def _reviews_search(qdrant_client, query_embedding, item_list, k, profile):
+    """Start the reviews search on a sync or async client, returning (result or awaitable, parser).
+
+    Grouped mode returns the best reviews of every item in one request, so a
+    popular item cannot crowd the others out of the context.
+    """
+    if config.REVIEWS_GROUPED:
+        return qdrant_client.query_points_groups(**_reviews_groups_query(query_embedding, item_list, k, profile)), _reviews_groups_context
+
+    return qdrant_client.query_points(**_reviews_query(query_embedding, item_list, k, profile)), _reviews_context
+
+
+def _reviews_context(results):
+
+    retrieved_context_ids = []
+    retrieved_context = []
+    similarity_scores = []
+
+    for result in results.points:
+        retrieved_context_ids.append(result.payload["parent_asin"])
+        retrieved_context.append(result.payload["text"])
+        similarity_scores.append(result.score)
+
+    return {
+        "retrieved_context_ids": retrieved_context_ids,
+        "retrieved_context": retrieved_context,
+        "similarity_scores": similarity_scores,
+    }
+
+
+def _reviews_groups_context(results):
+
+    retrieved_context_ids = []
+    retrieved_context = []
+    similarity_scores = []
+
+    for group in results.groups:
+        for result in group.hits:
+            retrieved_context_ids.append(result.payload["parent_asin"])
+            retrieved_context.append(result.payload["text"])
+            similarity_scores.append(result.score)
+
+    return {
+        "retrieved_context_ids": retrieved_context_ids,
+        "retrieved_context": retrieved_context,
+        "similarity_scores": similarity_scores,
+    }
+
+
+def _no_reviews_context():
+    return {"retrieved_context_ids": [], "retrieved_context": [], "similarity_scores": []}
+
+
+def _reviews_cache_key(query, item_list, k, profile):
+    return ("reviews", retrieval_cache.normalize(query), tuple(sorted(item_list)), k, profile, config.REVIEWS_GROUPED, config.REVIEWS_MAX_PER_ITEM)
+
+
+@traceable(
+    name="retrieve_reviews_data",
+    run_type="retriever"
+)
+def retrieve_reviews_data(query, item_list, k=5, profile=None):
+    profile = resolve_search_profile(profile)
+
+    # A grouped search for no items would ask Qdrant for limit=0 groups
+    if not item_list:
+        return _no_reviews_context()
+
+    def _retrieve():
+        query_embedding = get_embedding(query)
+
+        qdrant_client = get_qdrant_client()
+
+        results, parse = _reviews_search(qdrant_client, query_embedding, item_list, k, profile)
+
+        return parse(results)
+
+    return retrieval_cache.fetch(config.REVIEWS_COLLECTION, _reviews_cache_key(query, item_list, k, profile), _retrieve)
+
+
+@traceable(
+    name="retrieve_reviews_data",
+    run_type="retriever"
+)
+async def aretrieve_reviews_data(query, item_list, k=5, profile=None):
+    profile = resolve_search_profile(profile)
+
+    if not item_list:
+        return _no_reviews_context()
+
+    async def _retrieve():
+        query_embedding = await aget_embedding(query)
+
+        qdrant_client = get_async_qdrant_client()
+
+        pending, parse = _reviews_search(qdrant_client, query_embedding, item_list, k, profile)
+
+        return parse(await pending)
+
+    return await retrieval_cache.afetch(config.REVIEWS_COLLECTION, _reviews_cache_key(query, item_list, k, profile), _retrieve)
+
+
+@traceable(
+    name="format_retrieved_reviews_context",
+    run_type="prompt"
+)
+def process_reviews_context(context):
+
+    formatted_context = ""
+
+    for id, chunk in zip(context["retrieved_context_ids"], context["retrieved_context"]):
+        formatted_context += f"- ID: {id}, review: {chunk}\n"
+
+    return formatted_context
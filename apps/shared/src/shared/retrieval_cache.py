@@ -0,0 +1,170 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from shared.core.config import config
+from shared.qdrant import get_qdrant_client, get_async_qdrant_client, collection_version, acollection_version
+
+
+logger = logging.getLogger(__name__)
+
+
+#### RETRIEVAL RESULT CACHE ####
+
+class RetrievalCache:
+    """Thread-safe LRU cache of retrieval results keyed by query parameters and collection version.
+
+    Keys are (collection, version stamp, *params). The version stamp of a
+    collection (or alias) is re-read from Qdrant at most every
+    version_check_seconds; when it changes, because ingestion re-pointed an
+    alias or bumped the collection's version, the collection's entries are
+    dropped and later lookups miss under the new stamp.
+    """
+
+    def __init__(self, max_size: int = 2048, version_check_seconds: float = 10):
+        self.max_size = max_size
+        self.version_check_seconds = version_check_seconds
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        return " ".join(query.split())
+
+    def _cached_version(self, collection: str):
+        """Return (version, fresh) from the last check of a collection."""
+        entry = self._versions.get(collection)
+
+        if entry is None:
+            return None, False
+
+        version, checked_at = entry
+        return version, time.monotonic() - checked_at < self.version_check_seconds
+
+    def _set_version(self, collection: str, version: str):
+        with self._lock:
+            previous = self._versions.get(collection)
+            self._versions[collection] = (version, time.monotonic())
+
+            if previous is not None and previous[0] != version:
+                stale = [key for key in self._entries if key[0] == collection]
+                for key in stale:
+                    del self._entries[key]
+                self.invalidations += 1
+                logger.info(f"Retrieval cache: {collection} changed to {version}, dropped {len(stale)} results")
+
+    def version(self, collection: str):
+        version, fresh = self._cached_version(collection)
+
+        if not fresh:
+            try:
+                version = collection_version(get_qdrant_client(), collection)
+            except Exception as e:
+                logger.warning(f"Retrieval cache: version check for {collection} failed, bypassing the cache: {e}")
+                return None
+            self._set_version(collection, version)
+
+        return version
+
+    async def aversion(self, collection: str):
+        version, fresh = self._cached_version(collection)
+
+        if not fresh:
+            try:
+                version = await acollection_version(get_async_qdrant_client(), collection)
+            except Exception as e:
+                logger.warning(f"Retrieval cache: version check for {collection} failed, bypassing the cache: {e}")
+                return None
+            self._set_version(collection, version)
+
+        return version
+
+    def get(self, key):
+        with self._lock:
+            result = self._entries.get(key)
+
+            if result is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return result
+
+    def set(self, key, result):
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def fetch(self, collection: str, params: tuple, fn):
+        """Return the cached result for (collection, params) or compute it with fn()."""
+        if self.max_size <= 0:
+            return fn()
+
+        version = self.version(collection)
+        if version is None:
+            return fn()
+
+        key = (collection, version, *params)
+        result = self.get(key)
+
+        if result is None:
+            result = fn()
+            self.set(key, result)
+
+        return result
+
+    async def afetch(self, collection: str, params: tuple, coro_fn):
+        if self.max_size <= 0:
+            return await coro_fn()
+
+        version = await self.aversion(collection)
+        if version is None:
+            return await coro_fn()
+
+        key = (collection, version, *params)
+        result = self.get(key)
+
+        if result is None:
+            result = await coro_fn()
+            self.set(key, result)
+
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "versions": {collection: version for collection, (version, _) in self._versions.items()},
+            }
+
+
+retrieval_cache = RetrievalCache(
+    max_size=config.RETRIEVAL_CACHE_MAX_SIZE,
+    version_check_seconds=config.RETRIEVAL_CACHE_VERSION_CHECK_SECONDS,
+)
@@ -0,0 +1,81 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from shared.core.config import config
+
+
+#### SEARCH PROFILES ####
+
+@dataclass(frozen=True)
+class SearchProfile:
+    """How much effort a retrieval spends: prefetch size, HNSW beam width, exact search.
+
+    Profiles never change how many results a tool returns, only how hard
+    the search works to find them.
+    """
+    name: str
+    prefetch_limit: int
+    hnsw_ef: int | None = None
+    exact: bool = False
+    # Below this much remaining request budget the graph steps down to a cheaper profile
+    min_remaining_seconds: float | None = None
+
+    def prefetch(self, k: int) -> int:
+        """Candidates per prefetch, never fewer than the k results asked for."""
+        return max(k, self.prefetch_limit)
+
+
+SEARCH_PROFILES = {
+    profile.name: profile
+    for profile in [
+        SearchProfile("fast", prefetch_limit=10, hnsw_ef=32, min_remaining_seconds=0),
+        # What the tools did before profiles existed
+        SearchProfile("balanced", prefetch_limit=20, min_remaining_seconds=8),
+        SearchProfile("thorough", prefetch_limit=50, hnsw_ef=256, min_remaining_seconds=20),
+        # Brute force over every vector, for offline evals where latency does not matter
+        SearchProfile("exact", prefetch_limit=50, exact=True),
+    ]
+}
+
+
+def get_search_profile(name: str) -> SearchProfile:
+    if name not in SEARCH_PROFILES:
+        raise ValueError(f"Unknown search profile {name!r}, expected one of {sorted(SEARCH_PROFILES)}")
+
+    return SEARCH_PROFILES[name]
+
+
+def select_search_profile(remaining_seconds: float) -> SearchProfile:
+    """SEARCH_PROFILE, or a cheaper profile once the remaining request latency budget is too short for it.
+
+    The budget only ever lowers effort: thorough and exact are used when
+    configured or asked for, never picked because time is left.
+    """
+    preferred = get_search_profile(config.SEARCH_PROFILE)
+
+    if preferred.min_remaining_seconds is None or remaining_seconds >= preferred.min_remaining_seconds:
+        return preferred
+
+    candidates = [
+        profile for profile in SEARCH_PROFILES.values()
+        if profile.min_remaining_seconds is not None and remaining_seconds >= profile.min_remaining_seconds
+    ]
+
+    if not candidates:
+        return SEARCH_PROFILES["fast"]
+
+    return max(candidates, key=lambda profile: profile.min_remaining_seconds)
+
+
+# Set by the agent graph around tool execution, tools have no budget argument of their own
+search_profile_context: ContextVar[SearchProfile | None] = ContextVar("search_profile", default=None)
+
+
+def resolve_search_profile(profile: str | SearchProfile | None = None) -> SearchProfile:
+    """An explicit profile, else the one the graph chose for this request, else SEARCH_PROFILE."""
+    if isinstance(profile, SearchProfile):
+        return profile
+    if profile is not None:
+        return get_search_profile(profile)
+
+    return search_profile_context.get() or get_search_profile(config.SEARCH_PROFILE)
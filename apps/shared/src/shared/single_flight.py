@@ -0,0 +1,117 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+#### SINGLE-FLIGHT DEDUPLICATION ####
+
+class _LeaderCancelled(Exception):
+    """Set on a shared future whose leader was cancelled, its followers run the call again."""
+
+
+class SingleFlight:
+    """Collapse identical concurrent calls into one execution.
+
+    The first caller for a key runs the function, every caller that arrives
+    while it is still running waits on the same future and gets its result
+    (or exception). Nothing is kept once the call completes, so this only
+    removes duplicate in-flight work and never serves stale results.
+
+    Cancellation is not shared: if the leader is cancelled (say its client
+    disconnected) the waiting callers run the call again, one of them as the
+    new leader, and a cancelled follower only stops waiting.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.calls = 0
+        self.shared = 0
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def _join(self, key) -> tuple[Future, bool]:
+        """Return (future, leader) for a key, registering a new future if nothing is in flight."""
+        with self._lock:
+            self.calls += 1
+            future = self._in_flight.get(key)
+
+            if future is not None:
+                self.shared += 1
+                return future, False
+
+            future = Future()
+            # A running future cannot be cancelled, so a cancelled follower's wrap_future() leaves it alone
+            future.set_running_or_notify_cancel()
+            self._in_flight[key] = future
+            return future, True
+
+    def _finish(self, key, future, result=None, error=None):
+        # Unregister first, so callers retrying after a cancelled leader elect a new one
+        with self._lock:
+            del self._in_flight[key]
+
+        if isinstance(error, asyncio.CancelledError):
+            future.set_exception(_LeaderCancelled())
+        elif error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key, fn):
+        """Return (result, shared) where shared is True if another caller's execution was reused."""
+        while True:
+            future, leader = self._join(key)
+
+            if leader:
+                break
+
+            try:
+                return future.result(), True
+            except _LeaderCancelled:
+                continue
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+
+        self._finish(key, future, result)
+
+        return result, False
+
+    async def ado(self, key, coro_fn):
+        """Async do(): coro_fn is awaited by the leader, followers await its future without blocking the loop.
+
+        Sync and async callers share the same in-flight map, so either kind
+        can reuse the other's execution.
+        """
+        while True:
+            future, leader = self._join(key)
+
+            if leader:
+                break
+
+            try:
+                return await asyncio.wrap_future(future), True
+            except _LeaderCancelled:
+                continue
+
+        try:
+            result = await coro_fn()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+
+        self._finish(key, future, result)
+
+        return result, False
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "shared": self.shared,
+                "in_flight": len(self._in_flight),
+                "shared_ratio": self.shared / self.calls if self.calls else 0.0,
+            }
@@ -0,0 +1,95 @@
+from dataclasses import dataclass
+
+from qdrant_client.models import (
+    SearchParams,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+)
+
+from shared.core.config import config
+
+
+#### STORAGE PROFILES ####
+
+@dataclass(frozen=True)
+class StorageProfile:
+    """How a collection stores its dense vectors and payloads, and how it must be searched.
+
+    Quantized profiles keep the compressed vectors in RAM and search them
+    first; oversampling fetches extra candidates that are rescored with the
+    original vectors, which may live on disk.
+    """
+    name: str
+    quantization: ScalarQuantization | BinaryQuantization | None = None
+    # None leaves Qdrant's defaults: vectors in RAM, payloads on disk
+    vectors_on_disk: bool | None = None
+    payload_on_disk: bool | None = None
+    rescore: bool | None = None
+    oversampling: float | None = None
+
+    def search_params(self, hnsw_ef: int | None = None, exact: bool = False) -> SearchParams | None:
+        """SearchParams for dense queries against a collection with this profile, None for the defaults."""
+        quantization = None
+        if self.quantization is not None:
+            quantization = QuantizationSearchParams(rescore=self.rescore, oversampling=self.oversampling)
+
+        if quantization is None and hnsw_ef is None and not exact:
+            return None
+
+        return SearchParams(hnsw_ef=hnsw_ef, exact=exact, quantization=quantization)
+
+    def bytes_per_vector(self, dimensions: int) -> float:
+        """RAM per dense vector: the quantized copy plus the originals unless they are on disk."""
+        originals = 0 if self.vectors_on_disk else dimensions * 4
+
+        if isinstance(self.quantization, ScalarQuantization):
+            return originals + dimensions
+        if isinstance(self.quantization, BinaryQuantization):
+            return originals + dimensions / 8
+
+        return originals
+
+
+STORAGE_PROFILES = {
+    profile.name: profile
+    for profile in [
+        StorageProfile("float32"),
+        StorageProfile("on-disk", vectors_on_disk=True, payload_on_disk=True),
+        StorageProfile(
+            "scalar-int8",
+            quantization=ScalarQuantization(
+                scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+            ),
+            vectors_on_disk=True,
+            rescore=True,
+            oversampling=1.5,
+        ),
+        StorageProfile(
+            "binary",
+            quantization=BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True)),
+            vectors_on_disk=True,
+            payload_on_disk=True,
+            rescore=True,
+            oversampling=3.0,
+        ),
+    ]
+}
+
+
+def get_storage_profile(name: str) -> StorageProfile:
+    if name not in STORAGE_PROFILES:
+        raise ValueError(f"Unknown storage profile {name!r}, expected one of {sorted(STORAGE_PROFILES)}")
+
+    return STORAGE_PROFILES[name]
+
+
+def items_search_params(hnsw_ef: int | None = None, exact: bool = False) -> SearchParams | None:
+    return get_storage_profile(config.ITEMS_STORAGE_PROFILE).search_params(hnsw_ef=hnsw_ef or config.QDRANT_HNSW_EF, exact=exact)
+
+
+def reviews_search_params(hnsw_ef: int | None = None, exact: bool = False) -> SearchParams | None:
+    return get_storage_profile(config.REVIEWS_STORAGE_PROFILE).search_params(hnsw_ef=hnsw_ef or config.QDRANT_HNSW_EF, exact=exact)
@@ -0,0 +1,78 @@
+import pytest
+
+from shared.query_filters import parse_query_filters
+
+
+@pytest.mark.parametrize("query, text, min_rating", [
+    ("headphones at least 4 stars", "headphones", 4.0),
+    ("headphones over 4.5 stars", "headphones", 4.5),
+    ("4+ stars headphones", "headphones", 4.0),
+    ("headphones 4 stars and up", "headphones", 4.0),
+    ("headphones with 4 stars or better", "headphones", 4.0),
+])
+def test_lower_rating_bounds(query, text, min_rating):
+    parsed = parse_query_filters(query)
+
+    assert parsed.text == text
+    assert parsed.min_rating == min_rating
+    assert parsed.max_rating is None
+
+
+@pytest.mark.parametrize("query, text, max_rating", [
+    ("at most 3 stars headphones", "headphones", 3.0),
+    ("laptop stand under 3 stars", "laptop stand", 3.0),
+    ("laptop stand rated below 2.5 stars", "laptop stand", 2.5),
+    ("headphones 3 stars or less", "headphones", 3.0),
+])
+def test_upper_rating_bounds(query, text, max_rating):
+    parsed = parse_query_filters(query)
+
+    assert parsed.text == text
+    assert parsed.max_rating == max_rating
+    assert parsed.min_rating is None
+
+
+def test_rating_without_a_bound_stays_in_the_text():
+    parsed = parse_query_filters("5 star hotel style pillows")
+
+    assert parsed.text == "5 star hotel style pillows"
+    assert parsed.min_rating is None
+    assert parsed.max_rating is None
+    assert parsed.filter() is None
+
+
+def test_rating_bounds_filter_average_rating():
+    parsed = parse_query_filters("earbuds between $20 and $50 at least 3 stars under 4.5 stars")
+    [price, rating] = parsed.filter().must
+
+    assert parsed.text == "earbuds"
+    assert (price.range.gte, price.range.lte) == (20.0, 50.0)
+    assert rating.key == "average_rating"
+    assert (rating.range.gte, rating.range.lte) == (3.0, 4.5)
+
+
+@pytest.mark.parametrize("query, brand", [
+    ("headphones made by Sony", "Sony"),
+    ("Amazon Basics brand batteries", "Amazon Basics"),
+    ("brand Anker chargers under $30", "Anker"),
+    ("Top Sony brand earbuds", "Sony"),
+])
+def test_cued_brands(query, brand):
+    parsed = parse_query_filters(query)
+
+    assert parsed.brand == brand
+    assert parsed.filter().must[-1].match.text == brand
+
+
+@pytest.mark.parametrize("query", [
+    "Best brand headphones",
+    "headphones delivered by Friday",
+    "batteries from Amazon Basics",
+    "Brand New headphones",
+    "Store brand cereal",
+])
+def test_phrases_without_a_brand_do_not_filter(query):
+    parsed = parse_query_filters(query)
+
+    assert parsed.brand is None
+    assert parsed.filter() is None
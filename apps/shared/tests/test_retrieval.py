@@ -0,0 +1,14 @@
+from shared.core.config import config
+from shared.retrieval import reviews_per_item
+
+
+def test_single_item_gets_every_review_asked_for():
+    assert reviews_per_item(["B0001"], 15) == 15
+
+
+def test_reviews_are_shared_out_between_items():
+    assert reviews_per_item(["B0001", "B0002", "B0003"], 6) == 2
+
+
+def test_several_items_are_capped_per_item():
+    assert reviews_per_item(["B0001", "B0002"], 20) == config.REVIEWS_MAX_PER_ITEM
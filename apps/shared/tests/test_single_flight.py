@@ -0,0 +1,122 @@
+import asyncio
+import threading
+
+import pytest
+
+from shared.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        return await asyncio.gather(*(flight.ado("key", fetch) for _ in range(5)))
+
+    results = asyncio.run(main())
+
+    assert calls == [1]
+    assert [result for result, _ in results] == ["result"] * 5
+    assert sorted(shared for _, shared in results) == [False] + [True] * 4
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        leader = asyncio.create_task(flight.ado("key", fetch))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(flight.ado("key", fetch)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+        return await asyncio.gather(*followers)
+
+    results = asyncio.run(main())
+
+    # One follower took over as the leader, the others reused its execution
+    assert len(calls) == 2
+    assert [result for result, _ in results] == ["result"] * 3
+    assert sorted(shared for _, shared in results) == [False, True, True]
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_cancelled_follower_does_not_cancel_the_call():
+    flight = SingleFlight("test")
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "result"
+
+    async def main():
+        leader = asyncio.create_task(flight.ado("key", fetch))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(flight.ado("key", fetch)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+
+        followers[0].cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await followers[0]
+
+        return await leader, await followers[1]
+
+    assert asyncio.run(main()) == (("result", False), ("result", True))
+
+
+def test_sync_follower_retries_after_async_leader_is_cancelled():
+    flight = SingleFlight("test")
+    started = threading.Event()
+    results = []
+
+    async def fetch():
+        started.set()
+        await asyncio.sleep(0.05)
+        return "async"
+
+    async def main():
+        leader = asyncio.create_task(flight.ado("key", fetch))
+        await asyncio.to_thread(started.wait)
+
+        follower = threading.Thread(target=lambda: results.append(flight.do("key", lambda: "sync")))
+        follower.start()
+        await asyncio.sleep(0.01)
+
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+        await asyncio.to_thread(follower.join)
+
+    asyncio.run(main())
+
+    assert results == [("sync", False)]
+
+
+def test_errors_are_shared():
+    flight = SingleFlight("test")
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def main():
+        return await asyncio.gather(*(flight.ado("key", fetch) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+
+    assert all(isinstance(result, ValueError) for result in results)